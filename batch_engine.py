@@ -0,0 +1,509 @@
+# batch_engine.py
+#  -plays many games of Quadtris at once, in lockstep, for training and testing bots. Every board
+#   is kept in one set of NumPy arrays (one int per row, bit c set when column c is filled, just
+#   like PlayGrid.row_masks) and every tick moves all of the boards forward together: the keys,
+#   gravity, locking, line clears, scoring and levels are done for every board with a handful of
+#   array operations instead of one Python PlayGrid at a time.
+#   The rules are the ones in engine.py and quadrominos.py, read from the same tables, so a board
+#   given the same rng and the same keys plays out exactly like an Engine would.
+#
+# Needs NumPy (pip install numpy), unlike the rest of the game.
+# To run: Open the terminal at this file location and type "py batch_engine.py" for a speed test,
+#   or "py batch_engine.py --check" to check that the boards still play exactly like Engine does
+
+import argparse
+import random
+import sys
+import time
+import quadrominos as quad
+from bot import HeuristicBot
+from engine import Engine, LEVEL_GUIDE, LOCK_DELAY, TICKS_PER_SECOND
+
+try:
+    import numpy as np
+except ImportError as error:
+    raise ImportError("batch_engine.py needs NumPy, install it with: pip install numpy") from error
+
+
+# The keys a board can press on a tick, by action number. Same keys as Engine.processInput
+ACTIONS = (None, "a", "d", "s", "w", "m", "n", "e")
+NOTHING, LEFT, RIGHT, SOFT_DROP, HARD_DROP, CLOCKWISE, COUNTERCLOCKWISE, HOLD = range(len(ACTIONS))
+# Key (Str) -> action number, including the arrow keys processInput also takes
+ACTION_CODES = {key: code for code, key in enumerate(ACTIONS)}
+ACTION_CODES["Right"] = CLOCKWISE
+ACTION_CODES["Left"] = COUNTERCLOCKWISE
+
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+# Shape tables:                                               #
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - #
+# The Quadromino tables as arrays, indexed by shape number    #
+# (position in quad.SHAPES) and orientation - 1. Directions   #
+# are 0 for clockwise (+1) and 1 for counterclockwise (-1)    #
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+NUM_SHAPES = len(quad.SHAPES)
+# How many sets of seven pieces each board is dealt at a time
+SETS_DEALT = 4
+SPAWNS = np.array([shape.spawn for shape in quad.SHAPES])
+# Where square1 goes back to when a piece is put on hold (see Quadromino.resetPiece)
+HELD_SPOTS = np.array([shape.held_spot for shape in quad.SHAPES])
+HELD_SHIFTS = np.array([shape.held_shift for shape in quad.SHAPES])
+# OFFSETS[shape, orientation] -> the (dcol, drow) of the 4 squares from square1.
+# Shapes with fewer orientations (the O piece) repeat their first one, which they never leave
+OFFSETS = np.zeros((NUM_SHAPES, 4, 4, 2), dtype=np.int64)
+# ROTATE_TO, ROTATE_KICK and ROTATE_CHECKS[shape, orientation, direction] are Quadromino.rotation_table,
+# with ROTATE_CHECKED marking which of the 4 check spaces are used. ROTATE_TURNS is False where
+# rotate() gives up straight away (the piece would look the same)
+ROTATE_TO = np.zeros((NUM_SHAPES, 4, 2), dtype=np.int64)
+ROTATE_KICK = np.zeros((NUM_SHAPES, 4, 2, 2), dtype=np.int64)
+ROTATE_CHECKS = np.zeros((NUM_SHAPES, 4, 2, 4, 2), dtype=np.int64)
+ROTATE_CHECKED = np.zeros((NUM_SHAPES, 4, 2, 4), dtype=bool)
+ROTATE_TURNS = np.zeros((NUM_SHAPES, 4, 2), dtype=bool)
+# BOTTOMS[shape, orientation] -> Quadromino.bottoms, with BOTTOM_USED marking which of the 4 are used
+BOTTOMS = np.zeros((NUM_SHAPES, 4, 4, 2), dtype=np.int64)
+BOTTOM_USED = np.zeros((NUM_SHAPES, 4, 4), dtype=bool)
+for shape_num, shape in enumerate(quad.SHAPES):
+    for orientation in range(1, 5):
+        OFFSETS[shape_num, orientation - 1] = shape.offsets.get(orientation, shape.offsets[1])
+        for bottom_num, bottom in enumerate(shape.bottoms.get(orientation, shape.bottoms[1])):
+            BOTTOMS[shape_num, orientation - 1, bottom_num] = bottom
+            BOTTOM_USED[shape_num, orientation - 1, bottom_num] = True
+        ROTATE_TO[shape_num, orientation - 1] = orientation - 1
+        if orientation not in shape.offsets:
+            continue
+        for direction_num, direction in enumerate((1, -1)):
+            new_orientation, kick, checks = shape.rotation_table[(orientation, direction)]
+            ROTATE_TO[shape_num, orientation - 1, direction_num] = new_orientation - 1
+            ROTATE_KICK[shape_num, orientation - 1, direction_num] = kick
+            ROTATE_TURNS[shape_num, orientation - 1, direction_num] = not (new_orientation == orientation and kick == (0, 0))
+            for check_num, space in enumerate(checks):
+                ROTATE_CHECKS[shape_num, orientation - 1, direction_num, check_num] = space
+                ROTATE_CHECKED[shape_num, orientation - 1, direction_num, check_num] = True
+
+# LEVEL_GUIDE as arrays indexed by the current level: the level, cycle length and line
+# requirement of the next level. The last level points at itself with an unreachable requirement
+NEXT_LEVEL = np.array([1] + [guide[0] for guide in LEVEL_GUIDE[1:]] + [len(LEVEL_GUIDE)])
+NEXT_CYCLE = np.array([LEVEL_GUIDE[0][1]] + [guide[1] for guide in LEVEL_GUIDE[1:]] + [LEVEL_GUIDE[-1][1]])
+NEXT_LINES = np.array([0] + [guide[2] for guide in LEVEL_GUIDE[1:]] + [np.iinfo(np.int64).max])
+
+
+def dealSeven(rng):
+    ''' Returns the shape numbers of one set of seven pieces, in the order
+    PlayGrid.replenishQuadrominos would deal them with the same rng (list of int) '''
+    shapes = list(range(NUM_SHAPES))
+    dealt = []
+    while len(shapes) > 0:
+        dealt.append(shapes.pop(rng.randint(0, len(shapes) - 1)))
+    return dealt
+
+
+class BatchEngine():
+    ''' Runs many games of Quadtris side by side, one tick at a time for all of them.
+    Board b plays exactly like Engine(cols, rows, rngs[b]) given the same keys on the same ticks.
+    Boards that reach a game over stop changing until they are restarted.
+
+    The state is public, one entry per board (all NumPy arrays):
+    row_masks (boards, rows) - the grid, bit c of a row is set when column c is filled
+    shapes, orientations - the active piece's shape number (see quad.SHAPES) and orientation - 1
+    cols, row_nums - where the active piece's square1 is
+    can_hold - whether the active piece can still be held
+    held_shapes - the shape on hold (-1 for none), with held_orientations, held_cols and held_rows
+    scores, lines, levels, game_over, ticks - as in PlayGrid and Engine'''
+    def __init__(self, rngs, cols=10, rows=20):
+        ''' Creates the boards and puts the first piece into play on every one
+        INPUT
+        rngs (list of random.Random) - where each board's pieces come from, one per board
+        cols (int) the number of columns in the grid (at most 62)
+        rows (int) the number of rows in the grid'''
+        self.rngs = list(rngs)
+        self.num_boards = len(self.rngs)
+        self.num_cols = cols
+        self.num_rows = rows
+        self.full_row = (1 << cols) - 1
+        self.lock_length = round(LOCK_DELAY * TICKS_PER_SECOND)
+        self.everyone = np.arange(self.num_boards)
+
+        # Every board's upcoming pieces: dealt[b, next_piece[b]] is board b's next shape.
+        # A board is dealt new sets of seven only once it has used all of its own, so boards
+        # sitting at a game over don't hold on to anything and the array never grows
+        self.dealt = np.zeros((self.num_boards, SETS_DEALT * NUM_SHAPES), dtype=np.int8)
+        self.next_piece = np.full(self.num_boards, SETS_DEALT * NUM_SHAPES, dtype=np.int64)
+
+        self.row_masks = np.zeros((self.num_boards, rows), dtype=np.int64)
+        self.shapes = np.zeros(self.num_boards, dtype=np.int64)
+        self.orientations = np.zeros(self.num_boards, dtype=np.int64)
+        self.cols = np.zeros(self.num_boards, dtype=np.int64)
+        self.row_nums = np.zeros(self.num_boards, dtype=np.int64)
+        self.can_hold = np.zeros(self.num_boards, dtype=bool)
+        self.held_shapes = np.zeros(self.num_boards, dtype=np.int64)
+        self.held_orientations = np.zeros(self.num_boards, dtype=np.int64)
+        self.held_cols = np.zeros(self.num_boards, dtype=np.int64)
+        self.held_rows = np.zeros(self.num_boards, dtype=np.int64)
+        self.scores = np.zeros(self.num_boards, dtype=np.int64)
+        self.lines = np.zeros(self.num_boards, dtype=np.int64)
+        self.levels = np.zeros(self.num_boards, dtype=np.int64)
+        self.cycle_lengths = np.zeros(self.num_boards, dtype=np.int64)
+        self.cycle_stages = np.zeros(self.num_boards, dtype=np.int64)
+        self.lock_ticks = np.zeros(self.num_boards, dtype=np.int64)
+        self.ticks = np.zeros(self.num_boards, dtype=np.int64)
+        self.game_over = np.zeros(self.num_boards, dtype=bool)
+
+        self.restart(self.everyone)
+
+    def restart(self, boards):
+        ''' Starts a new game on the given boards. Their pieces carry on from the next set of seven
+        INPUT
+        boards (array of int) - the boards to restart'''
+        boards = np.asarray(boards, dtype=np.int64)
+        self.row_masks[boards] = 0
+        self.held_shapes[boards] = -1
+        self.scores[boards] = 0
+        self.lines[boards] = 0
+        self.levels[boards] = 1
+        self.cycle_lengths[boards] = LEVEL_GUIDE[0][1]
+        self.cycle_stages[boards] = 1
+        self.lock_ticks[boards] = 0
+        self.ticks[boards] = 0
+        self.game_over[boards] = False
+        self.next_piece[boards] = -(-self.next_piece[boards] // NUM_SHAPES) * NUM_SHAPES
+        self.spawn(boards)
+
+    def dealPieces(self, boards):
+        ''' Deals new sets of seven pieces to the given boards, in place of the ones they have used up
+        INPUT
+        boards (array of int) - boards that have used all of their pieces'''
+        self.dealt[boards] = [sum((dealSeven(self.rngs[board]) for count in range(SETS_DEALT)), [])
+                              for board in boards]
+        self.next_piece[boards] -= self.dealt.shape[1]
+
+    def cells(self):
+        ''' Returns every board's grid as 0s and 1s (array of uint8, boards x rows x cols) '''
+        columns = np.arange(self.num_cols)
+        return ((self.row_masks[:, :, None] >> columns) & 1).astype(np.uint8)
+
+    def occupied(self, boards, cols, rows, spaces, checked=None):
+        ''' Returns which boards have any of the given spaces occupied or out of bounds,
+        by the same rules as PlayGrid.anyOccupied (spaces above the grid are always free)
+        INPUT
+        boards (array of int) - the boards to look at
+        cols, rows (arrays of int) - the space each board's spaces are measured from
+        spaces (array of int, boards x spaces x 2) - the (dcol, drow) of the spaces to check
+        checked (array of bool, boards x spaces) - which spaces count (default: all of them)
+
+        OUTPUT
+        occupied (array of bool) - one per board'''
+        space_cols = cols[:, None] + spaces[:, :, 0]
+        space_rows = rows[:, None] + spaces[:, :, 1]
+        outside = (space_rows >= self.num_rows) | (space_cols < 0) | (space_cols >= self.num_cols)
+        masks = self.row_masks[boards[:, None], np.clip(space_rows, 0, self.num_rows - 1)]
+        filled = (masks >> np.clip(space_cols, 0, self.num_cols - 1)) & 1 == 1
+        hits = (space_rows >= 0) & (outside | filled)
+        if checked is not None:
+            hits &= checked
+        return hits.any(axis=1)
+
+    def move(self, boards, dx, dy):
+        ''' Moves the active pieces of the given boards, where they can move (see Quadromino.move)
+        INPUT
+        boards (array of int) - the boards to move the pieces of
+        dx, dy (int or array of int) - the change in column and row
+
+        OUTPUT
+        moved (array of int) - the boards whose piece moved'''
+        new_cols = self.cols[boards] + dx
+        new_rows = self.row_nums[boards] + dy
+        spaces = OFFSETS[self.shapes[boards], self.orientations[boards]]
+        free = ~self.occupied(boards, new_cols, new_rows, spaces)
+        moved = boards[free]
+        self.cols[moved] = new_cols[free]
+        self.row_nums[moved] = new_rows[free]
+        return moved
+
+    def rotate(self, boards, direction):
+        ''' Rotates the active pieces of the given boards, where they can rotate (see Quadromino.rotate)
+        INPUT
+        boards (array of int) - the boards to rotate the pieces of
+        direction (int) {0, 1} - 0 for clockwise, 1 for counterclockwise'''
+        shapes = self.shapes[boards]
+        orientations = self.orientations[boards]
+        blocked = self.occupied(boards, self.cols[boards], self.row_nums[boards],
+                                ROTATE_CHECKS[shapes, orientations, direction],
+                                ROTATE_CHECKED[shapes, orientations, direction])
+        turns = ROTATE_TURNS[shapes, orientations, direction] & ~blocked
+        turned = boards[turns]
+        kicks = ROTATE_KICK[shapes[turns], orientations[turns], direction]
+        self.orientations[turned] = ROTATE_TO[shapes[turns], orientations[turns], direction]
+        self.cols[turned] += kicks[:, 0]
+        self.row_nums[turned] += kicks[:, 1]
+
+    def spawn(self, boards):
+        ''' Puts the next piece into play on the given boards (see Engine.useNextQuadromino) '''
+        used_up = boards[self.next_piece[boards] >= self.dealt.shape[1]]
+        if len(used_up):
+            self.dealPieces(used_up)
+        shapes = self.dealt[boards, self.next_piece[boards]].astype(np.int64)
+        self.next_piece[boards] += 1
+        self.shapes[boards] = shapes
+        self.orientations[boards] = 0
+        self.cols[boards] = SPAWNS[shapes, 0]
+        self.row_nums[boards] = SPAWNS[shapes, 1]
+        self.can_hold[boards] = True
+
+    def dropDistance(self, boards):
+        ''' Returns how many rows the active pieces of the given boards can fall, by the same rules
+        as PlayGrid.dropDistance: the gap below the lowest square of each of the piece's columns
+        (array of int)'''
+        shapes = self.shapes[boards]
+        orientations = self.orientations[boards]
+        bottoms = BOTTOMS[shapes, orientations]
+        bottom_cols = self.cols[boards, None] + bottoms[:, :, 0]
+        bottom_rows = self.row_nums[boards, None] + bottoms[:, :, 1]
+        # filled[board, row, bottom]: whether the space in that bottom's column and row is filled
+        filled = (self.row_masks[boards][:, :, None] >> np.clip(bottom_cols, 0, self.num_cols - 1)[:, None, :]) & 1 == 1
+        filled &= np.arange(self.num_rows)[None, :, None] > bottom_rows[:, None, :]
+        landing = np.where(filled.any(axis=1), filled.argmax(axis=1), self.num_rows)
+        # Above the grid a piece can hang over the sides, but it can't fall into the walls
+        outside = (bottom_cols < 0) | (bottom_cols >= self.num_cols)
+        gaps = np.where(outside, 0, landing) - 1 - bottom_rows
+        gaps = np.where(BOTTOM_USED[shapes, orientations], gaps, self.num_rows)
+        return np.minimum(gaps.min(axis=1), self.num_rows)
+
+    def hardDrop(self, boards):
+        ''' Drops the active pieces of the given boards as far as they go and locks them in '''
+        self.row_nums[boards] += self.dropDistance(boards)
+        self.deposit(boards)
+        self.placePiece(boards)
+
+    def deposit(self, boards):
+        ''' Copies the active pieces of the given boards into their grids, ending the game on
+        boards where a square is above the grid or on a filled space (see PlayGrid.setSpace) '''
+        spaces = OFFSETS[self.shapes[boards], self.orientations[boards]]
+        space_cols = self.cols[boards, None] + spaces[:, :, 0]
+        space_rows = self.row_nums[boards, None] + spaces[:, :, 1]
+        blocked = self.occupied(boards, self.cols[boards], self.row_nums[boards], spaces)
+        self.game_over[boards[blocked | (space_rows < 0).any(axis=1)]] = True
+        inside = space_rows >= 0
+        np.bitwise_or.at(self.row_masks,
+                         (np.broadcast_to(boards[:, None], space_rows.shape)[inside], space_rows[inside]),
+                         np.left_shift(1, space_cols[inside]))
+
+    def clearLines(self, boards):
+        ''' Clears the full rows of the given boards and adds to their scores and lines (see PlayGrid.clearLines) '''
+        full = self.row_masks[boards] == self.full_row
+        cleared = full.sum(axis=1)
+        self.scores[boards] += cleared**2 * 100
+        self.lines[boards] += cleared
+        clearing = cleared > 0
+        if not clearing.any():
+            return
+        boards = boards[clearing]
+        full = full[clearing]
+        # Every row that stays moves down by the number of full rows below it. Full rows are all
+        # sent to one extra row past the bottom, which is thrown away
+        drops = np.cumsum(full[:, ::-1], axis=1)[:, ::-1]
+        targets = np.where(full, self.num_rows, np.arange(self.num_rows) + drops)
+        compacted = np.zeros((len(boards), self.num_rows + 1), dtype=np.int64)
+        compacted[np.arange(len(boards))[:, None], targets] = self.row_masks[boards]
+        self.row_masks[boards] = compacted[:, :self.num_rows]
+
+    def placePiece(self, boards):
+        ''' Clears lines and brings in the next piece on boards whose piece was just deposited '''
+        self.clearLines(boards)
+        self.spawn(boards)
+
+    def resetPiece(self, boards):
+        ''' Returns the active pieces of the given boards to their held spots, the same way (and
+        with the same checked moves) as Quadromino.resetPiece'''
+        self.row_nums[boards] = np.minimum(self.row_nums[boards], -4)
+        for turn in range(3):
+            self.rotate(boards[self.orientations[boards] != 0], 0)
+        spots = HELD_SPOTS[self.shapes[boards]]
+        self.move(boards, spots[:, 0] - self.cols[boards], spots[:, 1] - self.row_nums[boards])
+        shifting = boards[HELD_SHIFTS[self.shapes[boards]] != 0]
+        self.move(shifting, HELD_SHIFTS[self.shapes[shifting]], 0)
+
+    def hold(self, boards):
+        ''' Swaps the active pieces of the given boards with their held pieces, where the active
+        piece can be held (see PlayGrid.holdQuadromino) '''
+        boards = boards[self.can_hold[boards]]
+        self.can_hold[boards] = False
+        self.resetPiece(boards)
+        holding = (self.shapes[boards], self.orientations[boards], self.cols[boards], self.row_nums[boards])
+        # A piece coming off hold keeps where it was reset to, and can't be held again
+        swapping = boards[self.held_shapes[boards] >= 0]
+        self.shapes[swapping] = self.held_shapes[swapping]
+        self.orientations[swapping] = self.held_orientations[swapping]
+        self.cols[swapping] = self.held_cols[swapping]
+        self.row_nums[swapping] = self.held_rows[swapping]
+        self.spawn(boards[self.held_shapes[boards] < 0])
+        self.held_shapes[boards], self.held_orientations[boards], self.held_cols[boards], self.held_rows[boards] = holding
+
+    def step(self, actions):
+        ''' Presses one key on every board that is still playing and moves them forward a tick,
+        like Engine.processInput followed by Engine.update
+        INPUT
+        actions (array of int) - the action number (see ACTIONS) for every board'''
+        actions = np.asarray(actions)
+        playing = np.flatnonzero(~self.game_over)
+        keys = actions[playing]
+        self.move(playing[keys == LEFT], -1, 0)
+        self.move(playing[keys == RIGHT], 1, 0)
+        self.move(playing[keys == SOFT_DROP], 0, 1)
+        self.rotate(playing[keys == CLOCKWISE], 0)
+        self.rotate(playing[keys == COUNTERCLOCKWISE], 1)
+        self.hold(playing[keys == HOLD])
+        self.hardDrop(playing[keys == HARD_DROP])
+        self.update(playing)
+
+    def update(self, boards):
+        ''' Moves the given boards forward by one tick: at the end of every cycle, applies gravity,
+        locks the piece and updates the level (see Engine.update) '''
+        self.ticks[boards] += 1
+        ending = boards[self.cycle_stages[boards] > self.cycle_lengths[boards]]
+        self.cycle_stages[ending] = 1
+        fell = self.move(ending, 0, 1)
+        self.lock_ticks[fell] = self.ticks[fell] + self.lock_length
+        locking = ending[self.ticks[ending] >= self.lock_ticks[ending]]
+        self.deposit(locking)
+        self.placePiece(locking)
+        self.updateLevel(ending)
+        self.cycle_stages[boards] += 1
+
+    def updateLevel(self, boards):
+        ''' Moves the given boards up a level where they cleared enough lines (see Engine.updateLevel) '''
+        levels = self.levels[boards]
+        up = self.lines[boards] >= NEXT_LINES[levels]
+        rising = boards[up]
+        self.cycle_lengths[rising] = NEXT_CYCLE[levels[up]]
+        self.levels[rising] = NEXT_LEVEL[levels[up]]
+
+
+def describeEngine(engine):
+    ''' Returns the state of an Engine as a BatchEngine board would hold it (tuple), for comparing
+    the two (see boardState)'''
+    grid = engine.play_field
+    state = [tuple(grid.row_masks), grid.score, grid.num_line_clears, engine.level, not engine.gameActive()]
+    if engine.gameActive():
+        for piece in (engine.piece, grid.held_piece):
+            if piece == None:
+                state.append(None)
+            else:
+                state.append((quad.SHAPES.index(type(piece)), piece.orientation - 1,
+                              piece.square1.col, piece.square1.row))
+        state.append(engine.piece.can_hold)
+    return tuple(state)
+
+
+def boardState(batch, board):
+    ''' Returns the state of one board of a BatchEngine in the same form as describeEngine (tuple) '''
+    state = [tuple(int(mask) for mask in batch.row_masks[board]), int(batch.scores[board]),
+             int(batch.lines[board]), int(batch.levels[board]), bool(batch.game_over[board])]
+    if not batch.game_over[board]:
+        state.append((int(batch.shapes[board]), int(batch.orientations[board]),
+                      int(batch.cols[board]), int(batch.row_nums[board])))
+        if batch.held_shapes[board] < 0:
+            state.append(None)
+        else:
+            state.append((int(batch.held_shapes[board]), int(batch.held_orientations[board]),
+                          int(batch.held_cols[board]), int(batch.held_rows[board])))
+        state.append(bool(batch.can_hold[board]))
+    return tuple(state)
+
+
+def checkAgainstEngine(num_boards, steps, seed=0, press_chance=0.2):
+    ''' Plays the same games on Engines and on one BatchEngine, pressing the same keys on the same
+    ticks, and compares every board after every tick. Half of the boards are played by
+    bot.HeuristicBot (without lookahead, so it is quick) to reach the higher levels, the rest
+    press random keys, hold included
+    INPUT
+    num_boards (int) - how many games to play
+    steps (int) - how many ticks to play them for
+    seed (int) - seed for the pieces and the random keys
+    press_chance (float) - the chance of a random-key board pressing a key on any tick
+
+    OUTPUT
+    difference (Str) - the first difference found, or None if every board always matched
+    batch (BatchEngine) - the boards as they were when the check ended'''
+    engines = [Engine(rng=random.Random(f"{seed} {board}")) for board in range(num_boards)]
+    for engine in engines:
+        engine.start()
+    batch = BatchEngine([random.Random(f"{seed} {board}") for board in range(num_boards)])
+    bots = [HeuristicBot(budget=None, lookahead=False) if board % 2 == 0 else None
+            for board in range(num_boards)]
+    key_rng = random.Random(f"{seed} keys")
+    for step in range(steps):
+        actions = np.full(num_boards, NOTHING)
+        for board, engine in enumerate(engines):
+            if not engine.gameActive():
+                continue
+            if bots[board] != None:
+                key = bots[board].nextInput(engine)
+            elif key_rng.random() < press_chance:
+                key = key_rng.choice(ACTIONS[1:])
+            else:
+                key = None
+            if key != None:
+                engine.processInput(key)
+                actions[board] = ACTION_CODES[key]
+            engine.update()
+        batch.step(actions)
+        for board, engine in enumerate(engines):
+            expected = describeEngine(engine)
+            found = boardState(batch, board)
+            if found != expected:
+                return (f"board {board} differs after tick {step + 1}:\n"
+                        f"  Engine:      {expected}\n  BatchEngine: {found}"), batch
+    return None, batch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measures how many board-steps per second BatchEngine runs")
+    parser.add_argument("--boards", type=int, default=None,
+                        help="how many boards play at once (default 4096, 16 with --check)")
+    parser.add_argument("--steps", type=int, default=None,
+                        help="how many ticks to run (default 1000, 5000 with --check)")
+    parser.add_argument("--press-chance", type=float, default=0.2,
+                        help="the chance of a board pressing a random key on any tick (default 0.2)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the pieces and the keys")
+    parser.add_argument("--check", action="store_true",
+                        help="instead of measuring speed, play the same games on Engines and check every board matches")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        boards = 16 if args.boards == None else args.boards
+        steps = 5000 if args.steps == None else args.steps
+        difference, batch = checkAgainstEngine(boards, steps, args.seed, args.press_chance)
+        if difference != None:
+            print(difference)
+            sys.exit(1)
+        print(f"{boards} boards matched Engine on all {steps} ticks "
+              f"(up to level {batch.levels.max()}, {batch.game_over.sum()} games over)")
+        return
+    if args.boards == None:
+        args.boards = 4096
+    if args.steps == None:
+        args.steps = 1000
+
+    engine = BatchEngine([random.Random(f"{args.seed} {board}") for board in range(args.boards)])
+    key_rng = np.random.default_rng(args.seed)
+    board_steps = 0
+    games = 0
+    start = time.perf_counter()
+    for step in range(args.steps):
+        presses = key_rng.random(args.boards) < args.press_chance
+        actions = np.where(presses, key_rng.integers(1, len(ACTIONS), args.boards), NOTHING)
+        board_steps += args.boards - int(engine.game_over.sum())
+        engine.step(actions)
+        # Keep every board busy: finished games start over straight away
+        finished = np.flatnonzero(engine.game_over)
+        if len(finished):
+            games += len(finished)
+            engine.restart(finished)
+    seconds = max(time.perf_counter() - start, 1e-9)
+    print(f"{board_steps} board-steps in {seconds:.2f} s")
+    print(f"  {board_steps / seconds:12.1f} board-steps/sec")
+    print(f"  {games / seconds:12.1f} games/sec")
+
+if __name__ == "__main__":
+    main()
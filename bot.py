@@ -0,0 +1,207 @@
+# bot.py
+#  -a computer player for Quadtris. For every piece it looks at every place the piece can reach
+#   (see placements.py), scores the grid each one would leave behind and presses the keys that
+#   take the piece to the best one, through Engine.processInput like a player would. With the
+#   time left it also looks one piece ahead, at where the next piece could go after that.
+#   Every move has a time budget: when it runs out the bot goes with the best placement so far.
+#
+#   The bot is a policy (see simulate.py), so it can play without a window
+#   ("py simulate.py --policy bot") or in the game ("py game.py --ai").
+
+import time
+from placements import findPlacements, columnMasks, addSpaces
+
+
+# How much each thing about a grid is worth, for scoring grids. The height, lines, holes and
+# bumpiness weights are Yiyuan Lee's, tuned for a 10 x 20 grid
+# height: the heights of every column added up
+# lines: lines cleared by the placement
+# holes: empty spaces with a block somewhere above them
+# bumpiness: the differences in height between neighboring columns added up
+# wells: how far each column is below both of its neighbors (the walls count as tall), added up
+DEFAULT_WEIGHTS = {"height": -0.510066,
+                   "lines": 0.760666,
+                   "holes": -0.35663,
+                   "bumpiness": -0.184483,
+                   "wells": -0.05}
+
+
+class Board():
+    ''' A grid after some pieces were placed: only the parts of a PlayGrid that
+    findPlacements and evaluateBoard look at '''
+    def __init__(self, num_cols, num_rows, row_masks, lines=0):
+        ''' INPUT
+        num_cols (int), num_rows (int) - the size of the grid
+        row_masks (list of int) - the rows, as in PlayGrid.row_masks
+        lines (int) - how many lines were cleared getting here'''
+        self.num_cols = num_cols
+        self.num_rows = num_rows
+        self.row_masks = row_masks
+        self.lines = lines
+
+    def place(self, placement):
+        ''' Returns the Board after the placement locks into place and full rows are cleared
+        INPUT
+        placement (placements.Placement) - where the piece goes'''
+        masks = list(self.row_masks)
+        for col, row in placement.spaces:
+            if row >= 0:
+                masks[row] |= 1 << col
+        full_row = (1 << self.num_cols) - 1
+        kept = [mask for mask in masks if mask != full_row]
+        cleared = self.num_rows - len(kept)
+        return Board(self.num_cols, self.num_rows, [0] * cleared + kept, self.lines + cleared)
+
+
+def evaluateBoard(board, weights=DEFAULT_WEIGHTS):
+    ''' Returns how good a grid is to keep playing on (float, higher is better)
+    INPUT
+    board (Board) - the grid to score
+    weights (dict) - how much each thing about the grid is worth (see DEFAULT_WEIGHTS)'''
+    num_cols = board.num_cols
+    num_rows = board.num_rows
+    heights = [0] * num_cols
+    holes = 0
+    covered = 0     # Columns with a block in this row or above
+    for row, mask in enumerate(board.row_masks):
+        if covered:
+            holes += bin(covered & ~mask).count("1")
+        new = mask & ~covered
+        while new:
+            lowest = new & -new
+            heights[lowest.bit_length() - 1] = num_rows - row
+            new ^= lowest
+        covered |= mask
+
+    bumpiness = 0
+    wells = 0
+    left = num_rows     # The walls count as tall columns
+    for col in range(num_cols):
+        height = heights[col]
+        if col < num_cols - 1:
+            right = heights[col + 1]
+            bumpiness += abs(height - right)
+        else:
+            right = num_rows
+        if left > height < right:
+            wells += min(left, right) - height
+        left = height
+    return (weights["height"] * sum(heights) + weights["lines"] * board.lines + weights["holes"] * holes
+            + weights["bumpiness"] * bumpiness + weights["wells"] * wells)
+
+
+def toppedOut(placement):
+    ''' Returns true if locking the placement ends the game (part of it is above the grid) '''
+    return min(row for col, row in placement.spaces) < 0
+
+
+class HeuristicBot():
+    ''' Plays by picking the placement that leaves the best grid behind (see evaluateBoard)
+    and pressing its keys, one per tick '''
+    def __init__(self, rng=None, budget=0.005, weights=None, lookahead=True, max_evaluations=None):
+        ''' INPUT
+        rng (random.Random) - not used, every policy is given one
+        budget (float) - the most seconds picking one placement should take, or None for no time
+                         limit. Every placement of the active piece is always scored, however
+                         small the budget, and looking at the next piece gets what is left
+        weights (dict) - how much each thing about the grid is worth (default: DEFAULT_WEIGHTS)
+        lookahead (bool) - True to also look at where the next piece could go, while there is time
+        max_evaluations (int) - the most grids looking at the next piece may score for one
+                                placement, or None for no limit. Unlike the budget, this doesn't
+                                depend on how fast the computer is, so games play out the same
+                                every time when it is given and budget is None'''
+        self.budget = budget
+        self.weights = DEFAULT_WEIGHTS if weights == None else weights
+        self.lookahead = lookahead
+        self.max_evaluations = max_evaluations
+        self.keys = ""          # The keys left to press for the current placement
+        self.expected = None    # (piece, orientation, col, row) the next key should start from
+        self.cutoffs = 0        # How many placements were picked before the lookahead was done
+
+    def nextInput(self, engine):
+        ''' Returns the key to press this tick (Str), or None to press nothing '''
+        piece = engine.piece
+        state = (piece, piece.orientation, piece.square1.col, piece.square1.row)
+        # A new piece, or gravity moved this one, so the keys left don't fit any more
+        if state != self.expected or not self.keys:
+            placement = self.pickPlacement(engine)
+            self.keys = placement.inputs if placement != None else "w"
+        key = self.keys[0]
+        self.keys = self.keys[1:]
+        self.expected = self.afterKey(piece, state, key)
+        return key
+
+    def afterKey(self, piece, state, key):
+        ''' Returns the state the piece will be in after pressing key from state, or None when the
+        key locks it. Keys come from a placement's inputs, so they always succeed '''
+        piece, orientation, col, row = state
+        if key == "a":
+            return (piece, orientation, col - 1, row)
+        if key == "d":
+            return (piece, orientation, col + 1, row)
+        if key == "s":
+            return (piece, orientation, col, row + 1)
+        if key == "m" or key == "n":
+            new_orientation, kick, checks = piece.rotation_table[(orientation, 1 if key == "m" else -1)]
+            return (piece, new_orientation, col + kick[0], row + kick[1])
+        return None
+
+    def pickPlacement(self, engine):
+        ''' Returns the best placement for the active piece that was found within the time budget
+        (placements.Placement), or None if the piece can't go anywhere'''
+        deadline = None if self.budget == None else time.perf_counter() + self.budget
+        grid = engine.play_field
+        board = Board(grid.num_cols, grid.num_rows, grid.row_masks)
+        columns = columnMasks(grid)
+        placements = findPlacements(engine.piece, grid, columns)
+        if not placements:
+            return None
+
+        # Score the grid every placement leaves behind. Placements that end the game come last
+        scored = []
+        for placement in placements:
+            after = board.place(placement)
+            if toppedOut(placement):
+                scored.append((float("-inf"), placement, after))
+            else:
+                scored.append((evaluateBoard(after, self.weights), placement, after))
+        scored.sort(key=lambda entry: entry[0], reverse=True)
+        best = scored[0][1]
+        if not self.lookahead or not grid.up_next:
+            return best
+
+        # With the rest of the budget, go through the placements from best to worst and score each
+        # one by the best grid the next piece can leave behind. The best placement is looked at
+        # first, so stopping at any point still gives a good answer. A placement that is stopped
+        # part of the way through can still win: its real score is at least as good as that
+        next_piece = grid.up_next[0]
+        best_score = None
+        evaluations = 0
+        for score, placement, after in scored:
+            if score == float("-inf"):
+                break
+            if self.outOfBudget(deadline, evaluations):
+                self.cutoffs += 1
+                return best
+            # Unless lines were cleared, the grid's columns only gain the placement's spaces
+            after_columns = addSpaces(columns, placement.spaces) if after.lines == board.lines else None
+            for next_placement in findPlacements(next_piece, after, after_columns):
+                if self.outOfBudget(deadline, evaluations):
+                    self.cutoffs += 1
+                    return best
+                if not toppedOut(next_placement):
+                    next_score = evaluateBoard(after.place(next_placement), self.weights)
+                    evaluations += 1
+                    if best_score == None or next_score > best_score:
+                        best_score = next_score
+                        best = placement
+        return best
+
+    def outOfBudget(self, deadline, evaluations):
+        ''' Returns true once a move has used up its time budget or its max_evaluations
+        INPUT
+        deadline (float) - time.perf_counter() when the budget runs out, or None for no limit
+        evaluations (int) - how many grids looking at the next piece has scored so far'''
+        if self.max_evaluations != None and evaluations >= self.max_evaluations:
+            return True
+        return deadline != None and time.perf_counter() > deadline
@@ -0,0 +1,506 @@
+# engine.py
+#  -the rules of Quadtris with no graphics at all: the PlayGrid, the active piece, gravity,
+#   locking, holding, scoring and level progression. Anything that wants to show the game
+#   (see renderer.py) registers itself as an observer and gets told when something changes.
+#   This lets the game run without a window, as fast as the computer allows.
+#
+# To run: Open the terminal at this file location and type "py game.py"
+
+import random
+import quadrominos as quad
+
+
+# The game moves forward in fixed ticks, TICKS_PER_SECOND of them every second of play,
+# no matter how often the screen is drawn. Every speed in the game is counted in ticks
+TICKS_PER_SECOND = 60
+TICK_LENGTH = 1 / TICKS_PER_SECOND     # seconds
+LOCK_DELAY = 0.5    # How many seconds the player has from the piece landing to its lock time
+
+# Tuple of tuples with (level, cycle_length, line_req) variables
+# level: which level the player is on
+# cycle length: how many ticks per cycle/gravity fall
+# line req: how many lines must be cleared to advance to this level
+LEVEL_GUIDE = ( (1, 60, 0),
+                (2, 50, 10),
+                (3, 40, 20),
+                (4, 30, 30),
+                (5, 25, 40),
+                (6, 20, 50),
+                (7, 15, 60),
+                (8, 10, 70),
+                (9, 5, 80),
+                (10, 3, 90),
+                (11, 2, 100),
+                (12, 1, 110) )
+
+
+class PlayGrid():
+    ''' A data structure to manage the grid for collision detection. Stores which spaces are filled
+    and their colors, as well as the upcoming Quadrominos and the Quadromino on hold.
+    The game will have one PlayGrid instantiated to manage the game.'''
+    def __init__(self, cols, rows, rng=None):
+        ''' Creates an empty grid with rows number of rows and cols number of columns
+        INPUT
+        cols (int) the number of columns in the grid
+        rows (int) the number of rows  in the grid
+        rng (random.Random) where the order of the pieces comes from. Giving each game its own
+                            seeded generator makes its pieces repeatable (default: the random module)
+
+        OUTPUT (PlayGrid) an empty PlayGrid object is initialized'''
+        # Bitboard: every row is one int, bit c is set when column c is filled.
+        # colors is the matching 2D array of fill colors, used for rendering
+        self.num_cols = cols
+        self.num_rows = rows
+        self.full_row = (1 << cols) - 1
+        self.row_masks = [0] * rows
+        self.colors = [[None] * cols for i in range(rows)]
+        # heights[c] is how many rows tall column c's stack is (0 when empty), counted from
+        # the bottom to its highest block. Kept up to date by setSpace and clearLines
+        self.heights = [0] * cols
+
+        self.up_next = []    # Stores the next 7 - 14 pieces (pieces are not random)
+        if rng == None:
+            rng = random
+        self.rng = rng
+        self.held_piece = None  # The player can hold a piece
+        self.piece_pool = {}    # Quadromino class -> pieces that locked and can be reused
+        self.game_over = False
+        self.num_line_clears = 0
+        self.score = 0
+
+    def getScore(self):
+        ''' Returns the current score (int)'''
+        return self.score
+
+    def getNumLines(self):
+        ''' Returns the number of lines that have been cleared so far (int)'''
+        return self.num_line_clears
+
+    def gameActive(self):
+        ''' Returns true if the game is active, false if there is a game over (bool) '''
+        return not self.game_over
+
+    def gameOver(self):
+        ''' Sets self.game_over to true '''
+        self.game_over = True
+
+    def getSpace(self, col, row):
+        ''' Returns the color of the block at the specified location of the grid
+        INPUT
+        col (int) [0, 9] - the column number to search
+        row (int) [0, 19] - the row number to search
+
+        Possible Outputs: None
+                          color (Str)'''
+        return self.colors[row][col]
+
+    def setSpace(self, block):
+        ''' Sets the space occupied by a Block to the Block's color
+        INPUT
+        block (Block) - the Block object to lock into place
+
+        OUTPUT
+        if the Block cannot be locked in (space out of bounds or already occupied), set game_over
+        to True
+        Saves the Block's color to it's location on PlayGrid '''
+        row = block.getRowPos()
+        col = block.getColPos()
+        if row < 0 or self.spaceOccupied(col, row):
+            # game over if out of bounds or if space is already occupied
+            self.game_over = True
+
+        if row >= 0:
+            self.row_masks[row] |= 1 << col
+            self.colors[row][col] = block.getColor()
+            self.heights[col] = max(self.heights[col], self.num_rows - row)
+
+    def columnHeight(self, col):
+        ''' Returns the height of a column's stack by searching down from the top of the grid
+        INPUT
+        col (int) [0, 9] - the column to measure'''
+        for row in range(self.num_rows):
+            if (self.row_masks[row] >> col) & 1:
+                return self.num_rows - row
+        return 0
+
+    def spaceOccupied(self, col, row):
+        ''' Returns true if the space is occupied by a non-zero value
+        OR returns true if space is out of bounds (piece is unable to move there)
+        INPUT
+        col (int) [0, 9] - the column number to search
+        row (int) [0, 19] - the row number to search
+
+        OUPUT
+        bool representing if the specified space is occupied'''
+        # Allow blocks to go on top of screen by not checking out of bounds above the Grid
+        if row < 0:
+            return False
+        if row >= self.num_rows or col < 0 or col >= self.num_cols:
+            return True
+        return (self.row_masks[row] >> col) & 1 == 1
+
+    def anyOccupied(self, col, row, offsets):
+        ''' Returns true if any of the given spaces is occupied or out of bounds
+        (same rules as spaceOccupied, checked against the row bitmasks)
+        INPUT
+        col (int), row (int) - the space the offsets are measured from
+        offsets (tuple of (dcol, drow) tuples) - the spaces to check, relative to (col, row)
+
+        OUTPUT
+        bool representing if at least one of the spaces is occupied'''
+        masks = self.row_masks
+        num_cols = self.num_cols
+        num_rows = self.num_rows
+        for dc, dr in offsets:
+            col_check = col + dc
+            row_check = row + dr
+            if row_check < 0:
+                continue
+            if row_check >= num_rows or col_check < 0 or col_check >= num_cols or (masks[row_check] >> col_check) & 1:
+                return True
+        return False
+
+    def dropDistance(self, col, row, bottoms):
+        ''' Returns how many rows a piece can fall before it collides
+        INPUT
+        col (int), row (int) - the location of the piece's square1
+        bottoms (tuple of (dcol, drow) tuples) - the lowest square of the piece in each of its columns
+
+        OUTPUT
+        distance (int) - the smallest gap below the piece, over all of its columns'''
+        num_rows = self.num_rows
+        num_cols = self.num_cols
+        distance = num_rows
+        for dc, dr in bottoms:
+            col_check = col + dc
+            row_check = row + dr
+            if col_check < 0 or col_check >= num_cols:
+                top = 0     # Above the grid a piece can hang over the sides, but it can't fall into the walls
+            else:
+                top = num_rows - self.heights[col_check]   # highest filled row (num_rows if empty)
+            if row_check < top:
+                gap = top - 1 - row_check
+            else:
+                # The piece is tucked under an overhang, look for the next block below it
+                gap = 0
+                while row_check + gap + 1 < num_rows and not (self.row_masks[row_check + gap + 1] >> col_check) & 1:
+                    gap += 1
+            if gap < distance:
+                distance = gap
+        return distance
+
+    def getNextQuadromino(self):
+        ''' Returns the next Quadromino and removes it from the up_next list
+
+        OUTPUT
+        piece (Quadromino) - the next piece to enter play'''
+        piece = self.up_next.pop(0)
+        # Ensure there are at least 7 pieces up_next
+        if len(self.up_next) < 7:
+            self.replenishQuadrominos()
+
+        return piece
+
+    def replenishQuadrominos(self):
+        ''' Refills the up_next list of Quadrominos
+        Adds one of each Quadromino shape to the list of upcoming pieces.
+        The Quadrominos are added in a random order
+
+        NO INPUT/OUTPUT'''
+        # Pieces that already locked are reused, new ones are only made when the pool runs out
+        seven_pieces = []
+        for shape in quad.SHAPES:
+            pool = self.piece_pool.get(shape)
+            seven_pieces.append(pool.pop() if pool else shape())
+        while(len(seven_pieces) > 0):
+            # Choose a random piece from the ordered list and move it to the up_next list
+            index = self.rng.randint(0, len(seven_pieces) - 1)
+            piece = seven_pieces.pop(index)
+            self.up_next.append(piece)
+
+    def recycleQuadromino(self, piece):
+        ''' Puts a piece that has locked into place back in the pool, to be dealt out again later
+        INPUT
+        piece (Quadromino) - a piece that is no longer in play'''
+        piece.respawn()
+        self.piece_pool.setdefault(type(piece), []).append(piece)
+
+    def clearLines(self):
+        ''' Goes through the grid and clears any rows that are full, adding points to the score
+        and shifting all rows as necessary
+
+        OUTPUT
+        full_rows (list of int) - the rows that were cleared, from top to bottom'''
+        # A row is full when its bitmask has every column bit set
+        full_row = self.full_row
+        masks = self.row_masks
+        full_rows = [row_num for row_num in range(self.num_rows) if masks[row_num] == full_row]
+
+        if full_rows:
+            # Compact in one pass from the bottom up: every row that stays is copied straight
+            # to its final position, no matter how many rows were cleared below it
+            colors = self.colors
+            write = self.num_rows - 1
+            for read in range(self.num_rows - 1, -1, -1):
+                if masks[read] != full_row:
+                    masks[write] = masks[read]
+                    colors[write] = colors[read]
+                    write -= 1
+            for row in range(write, -1, -1):
+                masks[row] = 0
+                colors[row] = [None] * self.num_cols
+
+            # Stacks that reached above the top cleared row are that many rows shorter now,
+            # the rest need to be measured again
+            top_cleared = self.num_rows - full_rows[0]
+            for col in range(self.num_cols):
+                if self.heights[col] > top_cleared:
+                    self.heights[col] -= len(full_rows)
+                else:
+                    self.heights[col] = self.columnHeight(col)
+
+        # Update score and line clears
+        self.num_line_clears += len(full_rows)
+        self.score += (len(full_rows)**2) * 100
+        return full_rows
+
+    def holdQuadromino(self, piece):
+        ''' Swaps the current piece with the piece in the "hold" position.
+        Returns the next piece if possible (update the active piece)
+        INPUT
+        piece (Quadromino) - the current active piece in play
+
+        OUTPUT
+        next_piece (Quadromino) - replacement for the current active piece in play'''
+        next_piece = piece  # If piece cannot hold, it returns the same piece.
+        if piece.canHold():
+            piece.setCanHold(False)
+            # Reset current piece
+            piece.resetPiece(self)
+            # Get the held piece/make a new one, and hold the current piece
+            if self.held_piece == None:
+                next_piece = self.getNextQuadromino()
+            else:
+                next_piece = self.held_piece
+            self.held_piece = piece
+        return next_piece
+
+    def __str__(self):
+        ''' String method for debugging '''
+        string = ""
+        for mask in self.row_masks:
+            string += format(mask, "0" + str(self.num_cols) + "b")[::-1] + "\n"
+        return string
+
+
+class GameObserver():
+    ''' Template for anything that wants to follow a game (like the Tk renderer).
+    Every method does nothing here, so an observer only overrides what it cares about.'''
+
+    def pieceSpawned(self, piece):
+        ''' A new piece entered play (or was swapped in from hold) '''
+        pass
+
+    def pieceMoved(self, piece):
+        ''' The active piece moved or rotated '''
+        pass
+
+    def ghostMoved(self, piece):
+        ''' The ghost projection of the active piece was recalculated '''
+        pass
+
+    def pieceLocked(self, piece):
+        ''' The active piece was deposited onto the PlayGrid '''
+        pass
+
+    def linesCleared(self, rows):
+        ''' Full rows were removed from the PlayGrid
+        rows (list of int) - the cleared rows, from top to bottom '''
+        pass
+
+    def upNextChanged(self, piece):
+        ''' piece (Quadromino) is now the next piece to enter play '''
+        pass
+
+    def holdChanged(self, piece):
+        ''' piece (Quadromino) is now the piece on hold '''
+        pass
+
+    def statsChanged(self, score, lines, level):
+        ''' The score, number of lines cleared, and level (ints) were updated '''
+        pass
+
+
+class Engine():
+    ''' Runs one game of Quadtris: owns the PlayGrid and the active piece, and moves the game
+    forward one tick at a time. Observers are told about every change so they can draw it.
+    The engine never looks at the real time: the caller decides when to run a tick, so a
+    simulation can run ticks as fast as the computer allows'''
+    def __init__(self, cols=10, rows=20, rng=None):
+        ''' Creates a game that has not started yet
+        INPUT
+        cols (int) the number of columns in the grid
+        rows (int) the number of rows in the grid
+        rng (random.Random) where the order of the pieces comes from (see PlayGrid)
+
+        OUTPUT (Engine) a new game, call start() to begin'''
+        self.play_field = PlayGrid(cols, rows, rng)
+        self.piece = None
+        self.observers = []
+
+        # Cycle variable to update on a timer (used for auto-falling)
+        self.cycle_stage = 1
+        self.level = 1
+        self.cycle_length = LEVEL_GUIDE[self.level - 1][1]
+
+        # Lock variable to allow for player movement after piece hit ground for a while
+        self.lock_tick = 0      # The tick the piece will lock on (updates after each fall)
+        self.lock_length = round(LOCK_DELAY * TICKS_PER_SECOND)     # The lock delay in ticks
+
+        # The ghost projection is only recalculated when the piece moves sideways, rotates,
+        # or a new piece/grid comes in. Falling straight down never changes where it lands
+        self.ghost_dirty = True
+        self.tick_count = 0         # Ticks run by update()
+        self.ghost_updates = 0      # Ticks where the ghost actually had to be recalculated
+
+        # Set to a timing.PhaseTimer to measure how long each phase of a tick takes
+        self.timer = None
+
+    def addObserver(self, observer):
+        ''' Registers an observer (GameObserver) to be told about changes to the game '''
+        self.observers.append(observer)
+
+    def notify(self, event, *args):
+        ''' Calls the method named event on every observer with the given arguments '''
+        for observer in self.observers:
+            getattr(observer, event)(*args)
+
+    def gameActive(self):
+        ''' Returns true if the game is active, false if there is a game over (bool) '''
+        return self.play_field.gameActive()
+
+    def timed(self, phase, function, *args):
+        ''' Calls function(*args) and returns its result, timing it as phase when there is a timer '''
+        if self.timer == None:
+            return function(*args)
+        return self.timer.call(phase, function, *args)
+
+    def start(self):
+        ''' Fills the up_next list and puts the first piece into play '''
+        self.play_field.replenishQuadrominos()
+        self.useNextQuadromino()
+
+    def useNextQuadromino(self):
+        ''' Puts the next piece from the up_next list into play '''
+        self.piece = self.play_field.getNextQuadromino()
+        self.ghost_dirty = True
+        self.notify("upNextChanged", self.play_field.up_next[0])
+        self.notify("pieceSpawned", self.piece)
+
+    def placePiece(self):
+        ''' Finishes off a piece that was just deposited: clears lines and brings in the next piece '''
+        self.notify("pieceLocked", self.piece)
+        self.ghost_dirty = True
+        full_rows = self.timed("clearLines", self.play_field.clearLines)
+        if full_rows:
+            self.notify("linesCleared", full_rows)
+        # The locked piece's Blocks are copied into the PlayGrid, so the piece itself can be reused
+        self.play_field.recycleQuadromino(self.piece)
+        self.useNextQuadromino()
+
+    def processInput(self, input):
+        ''' Takes user input as a string and responds appropriately
+        INPUT
+        input (Str) - user input on keyboard'''
+        # After a game over the last piece is locked in, so keys do nothing
+        if not self.gameActive():
+            return
+        piece = self.piece
+        grid = self.play_field
+        if input == "w":
+            piece.hardDrop(grid)
+            self.timed("depositQuadromino", piece.depositQuadromino, grid)
+            self.notify("pieceMoved", piece)
+            self.placePiece()
+        elif input == "a":
+            self.pieceMoved(piece.move(-1, 0, grid), True)
+        elif input == "s":
+            self.pieceMoved(piece.move(0, 1, grid), False)
+        elif input == "d":
+            self.pieceMoved(piece.move(1, 0, grid), True)
+        # Left/Right for movement
+        elif input == "Right" or input == "m":
+            self.pieceMoved(piece.rotate(1, grid), True)
+        elif input == "Left" or input == "n":
+            self.pieceMoved(piece.rotate(-1, grid), True)
+        elif input == "e":
+            self.holdQuadromino()
+
+    def pieceMoved(self, moved, moves_ghost):
+        ''' Tells the observers about a piece that moved, and marks the ghost for recalculation
+        INPUT
+        moved (bool) - whether the piece actually moved (nothing happens if it didn't)
+        moves_ghost (bool) - whether the movement can change where the piece lands'''
+        if moved:
+            if moves_ghost:
+                self.ghost_dirty = True
+            self.notify("pieceMoved", self.piece)
+
+    def holdQuadromino(self):
+        ''' Swaps the active piece with the piece on hold, if the active piece can be held '''
+        piece = self.piece
+        if piece.canHold():
+            had_held_piece = self.play_field.held_piece != None
+            self.piece = self.play_field.holdQuadromino(piece)
+            self.ghost_dirty = True
+            if not had_held_piece:
+                self.notify("upNextChanged", self.play_field.up_next[0])
+            self.notify("holdChanged", piece)
+            self.notify("pieceSpawned", self.piece)
+
+    def fallPiece(self):
+        ''' Make piece fall by a block if it can, and push back the time it will lock '''
+        # If the piece can fall, lower it by a block and reset lock_stage
+        if self.piece.move(0, 1, self.play_field):
+            self.notify("pieceMoved", self.piece)
+            self.lock_tick = self.tick_count + self.lock_length
+
+    def updateLevel(self):
+        ''' Increase level / speed at different increments of line clears, based on the LEVEL_GUIDE '''
+        num_lines = self.play_field.getNumLines()
+        if self.level < len(LEVEL_GUIDE):
+            line_req = LEVEL_GUIDE[self.level][2]
+            if num_lines >= line_req:
+                self.cycle_length = LEVEL_GUIDE[self.level][1]
+                self.level = LEVEL_GUIDE[self.level][0]
+
+    def updateStats(self):
+        ''' Updates the level and tells the observers the score, lines cleared and level '''
+        self.updateLevel()
+        self.notify("statsChanged", self.play_field.getScore(), self.play_field.getNumLines(), self.level)
+
+    def update(self):
+        ''' Moves the game forward by one tick: updates the ghost projection and, at the end of
+        every cycle, applies gravity, locks the piece and updates the level and stats '''
+        # Update ghost projection (only if something changed) and cycle count
+        self.tick_count += 1
+        if self.ghost_dirty:
+            self.ghost_dirty = False
+            self.ghost_updates += 1
+            self.timed("projectGhost", self.piece.projectGhost, self.play_field)
+            self.notify("ghostMoved", self.piece)
+
+        # action at end of cycle
+        if self.cycle_stage > self.cycle_length:
+            self.cycle_stage = 1
+            # Gravity / locking the piece in place
+            self.timed("fallPiece", self.fallPiece)
+            # If the lock time has been reached, deposit the piece
+            if self.tick_count >= self.lock_tick:
+                self.timed("depositQuadromino", self.piece.depositQuadromino, self.play_field)
+                self.placePiece()
+
+            # Update GUI/Text
+            self.timed("updateStats", self.updateStats)
+
+        self.cycle_stage += 1
@@ -22,300 +22,116 @@
 # To run: Open the terminal at this file location and type "py game.py"
 
 import graphics as gr
+import os
+import sys
 import time
-import random
-import quadrominos as quad
+from bot import HeuristicBot
+from engine import Engine, TICK_LENGTH
+from renderer import TkRenderer, ImageRenderer
+from timing import PhaseTimer
 
 
-class PlayGrid():
-    ''' A data structure to manage the grid for collision detection. Stores blocks and their locations,
-    as well as the upcoming Quadrominos and the Quadromino on hold.
-    The game will have one PlayGrid instantiated to manage the game.'''
-    def __init__(self, cols, rows):
-        ''' Creates a 2D array with rows number of rows and cols number of columns
-        INPUT
-        cols (int) the number of columns in the grid
-        rows (int) the number of rows  in the grid
-        
-        OUTPUT (PlayGrid) an empty PlayGrid object is initialized'''
-        self.grid = []
-        for row in range(rows):
-            row = []
-            for i in range(cols):
-                row.append(None)
-            self.grid.append(row)
-       
-        self.up_next = []    # Stores the next 7 - 14 pieces (pieces are not random)
-        self.held_piece = None  # The player can hold a piece
-        self.game_over = False
-        self.num_line_clears = 0
-        self.score = 0
-
-    def getScore(self):
-        ''' Returns the current score (int)'''
-        return self.score
-
-    def getNumLines(self):
-        ''' Returns the number of lines that have been cleared so far (int)'''
-        return self.num_line_clears
-
-    def gameActive(self):
-        ''' Returns true if the game is active, false if there is a game over (bool) '''
-        return not self.game_over
-                
-    def gameOver(self):
-        ''' Sets self.game_over to true '''
-        self.game_over = True
-
-    def getSpace(self, col, row):
-        ''' Returns the object at the specified location of the grid 
-        INPUT
-        col (int) [0, 9] - the column number to search
-        row (int) [0, 19] - the row number to search
-
-        Possible Outputs: None
-                          Block object'''
-        return self.grid[row][col]
-
-    def setSpace(self, block):
-        ''' Sets the space occupied by a Block to the Block
-        INPUT
-        block (Block) - the Block object to lock into place
-        
-        OUTPUT
-        if the Block cannot be locked in (space out of bounds or already occupied), set game_over
-        to True
-        Saves the Block object to it's location on PlayGrid '''
-        row = block.getRowPos()
-        col = block.getColPos()
-        if row < 0 or self.spaceOccupied(col, row):
-            # game over if out of bounds or if space is already occupied
-            self.game_over = True
-            if row >= 0: # if it is in-bounds, undraw the existing block
-                self.getSpace(col, row).undraw()
-
-        self.grid[row][col] = block
-
-    def spaceOccupied(self, col, row):
-        ''' Returns true if the space is occupied by a non-zero value
-        OR returns true if space is out of bounds (piece is unable to move there)
-        INPUT
-        col (int) [0, 9] - the column number to search
-        row (int) [0, 19] - the row number to search
-        
-        OUPUT
-        bool representing if the specified space is occupied'''
-        value = True
-        if col >= 0 and row >= 0 and col < 10 and row < 20:
-            if self.grid[row][col] == None:
-                value = False
-        # Allow blocks to go on top of screen by not checking out of bounds above the Grid
-        elif row < 0:
-            value = False
-        return value
-
-    def getNextQuadromino(self, window):
-        ''' Returns the next Quadromino and removes it from the up_next list 
-        INPUT
-        window (gr.GraphWin) - the graphics window
-        
-        OUTPUT
-        piece (Quadromino) - the next piece to enter play'''
-        # Get next piece, undraw its mini icon, and draw the next mini icon
-        piece = self.up_next.pop(0)
-        piece.undrawMini()
-        self.up_next[0].drawMiniIcon(window, 0)
-        # Ensure there are at least 7 pieces up_next
-        if len(self.up_next) < 7:
-            self.replenishQuadrominos()
-        
-        return piece
-    
-    def replenishQuadrominos(self):
-        ''' Refills the up_next list of Quadrominos
-        Adds one of each Quadromino shape to the list of upcoming pieces.
-        The Quadrominos are added in a random order 
-        
-        NO INPUT/OUTPUT'''
-        seven_pieces = [quad.SQuadromino(), quad.ZQuadromino(), quad.JQuadromino(), quad.LQuadromino(),
-                        quad.TQuadromino(), quad.OQuadromino(), quad.IQuadromino()]
-        while(len(seven_pieces) > 0):
-            # Choose a random piece from the ordered list and move it to the up_next list
-            index = random.randint(0, len(seven_pieces) - 1)
-            piece = seven_pieces.pop(index)
-            self.up_next.append(piece)
+# Finished backgrounds are saved here, so later games can load them instead of drawing them
+CACHE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+# Goes in the names of the saved backgrounds. Add one whenever makeBackground or fillRect
+# changes what the background looks like, so old pictures of it are never loaded
+BACKGROUND_VERSION = 1
 
-    def shiftDown(self, row): 
-        ''' Shifts all rows above the given one down by 1 row 
-        INPUT
-        row (int) [0, 19] - a row that should be recently cleared and empty'''
-        # Start at the cleared line, work way up
-        while(row > 0):
-            # Alias line and line above (lists passed by reference)
-            working_row = self.grid[row]
-            above_row = self.grid[row - 1]
-            # Copy row down, moving any blocks down
-            for index in range(0, len(above_row)):
-                # If space has a block, move the block
-                if not above_row[index] == None:
-                    above_row[index].move(0, 1)
-                working_row[index] = above_row[index]
-            row -= 1
-        
-        # Clear the top line
-        for index in range(0, len(self.grid[0])):
-            self.grid[0][index] = None
-
-    def clearRow(self, row):
-        ''' Clears a row on the grid and moves every row above down 
-        INPUT
-        row (int) [0, 19] - the row to be cleared'''
-        # Set all of the row to None and shift the above rows down
-        for index in range(0, len(self.grid[row])):
-            # If theres a block, undraw the block
-            if not self.grid[row][index] == None:
-                self.grid[row][index].undraw()
-            self.grid[row][index] = None
-        self.shiftDown(row)
-
-    def clearLines(self, win):
-        ''' Goes through the grid and clears any rows that are full, adding points to the score
-        and shifting all rows as necessary 
-        INPUT
-        win (gr.GraphWin) - the graphics window in use'''
-        full_rows = []
-        # Check every row for fullness
-        for row_num in range(0, 20):
-            # If any space is empty, all_blocks is False
-            all_blocks = True
-            for space in self.grid[row_num]:
-                if space == None:
-                    all_blocks = False
-                
-            # Add any full rows to a list
-            if all_blocks:
-                full_rows.append(row_num)
-
-        # Clear rows one at a time
-        for row in full_rows:
-            for block in self.grid[row]:
-                block.setColor("white")
-            win.update()
-            time.sleep(0.1)
-            self.clearRow(row)
-        
-        # Update score and line clears
-        self.num_line_clears += len(full_rows)
-        self.score += (len(full_rows)**2) * 100
-
-    def showUpNext(self, window):
-        ''' Displays the next piece by the corner of the grid 
-        INPUT
-        window (gr.GraphWin) - the graphics window in use'''
-        # draw the mini icon for the next piece
-        next_piece = self.up_next[0]
-        next_piece.drawMiniIcon(window, 0)
-
-    def holdQuadromino(self, piece, window):
-        ''' Swaps the current piece with the piece in the "hold" position. 
-        Returns the next piece if possible (update the active piece)
-        INPUT
-        piece (Quadromino) - the current active piece in play
-        window (gr.GraphWin) - the graphics window in use
-        
-        OUTPUT
-        next_piece (Quadromino) - replacement for the current active piece in play'''
-        next_piece = piece  # If piece cannot hold, it returns the same piece.
-        if piece.canHold():
-            piece.setCanHold(False)
-            # Reset current piece
-            piece.resetPiece(self)
-            # Get the held piece/make a new one, and hold the current piece
-            # Undraw the old mini icon, draw the new one
-            if self.held_piece == None:  
-                next_piece = self.getNextQuadromino(window)
-                self.held_piece = piece
-            else:
-                next_piece = self.held_piece
-                self.held_piece.undrawMini()
-                self.held_piece = piece
-            self.held_piece.drawMiniIcon(window, 1)
-        # Undraw current piece, return/swap out with next piece
-        piece.undraw()
-        next_piece.draw(window) # If canHold == False, piece will simply redraw with no noticable change
-        return next_piece
-
-    def __str__(self):
-        ''' String method for debugging '''
-        string = ""
-        for row in self.grid:
-            string += str(row) + "\n"
-        return string
-
-def drawGradient(window, red, green, blue):
-    '''Creates a 10 stage gradient accros the bakcground from the given RGB values to white
+def fillRect(pixels, width, x1, y1, x2, y2, rgb):
+    ''' Fills a rectangle of a packed RGB pixel buffer with one color
     INPUT
-    window (gr.GraphWin) - the graphics window in use
+    pixels (bytearray) - 3 bytes per pixel, row by row
+    width (int) - how many pixels wide the buffer is
+    x1, y1, x2, y2 (int) - the corners of the rectangle (both included)
+    rgb (bytes) - the color, 3 bytes'''
+    line = rgb * (x2 - x1 + 1)
+    for y in range(y1, y2 + 1):
+        start = (y * width + x1) * 3
+        pixels[start:start + len(line)] = line
+
+def makeBackground(width, height, red, green, blue):
+    '''Returns the pixels of everything that never changes during a game: a 10 stage gradient
+    across the background from the given RGB values to white, a 10x20 play field where each space
+    is 20 x 20 pixels, and the "Up Next" and "Hold" boxes
+    INPUT
+    width (int), height (int) - the size of the window
     red (int) [0, 255]  
     green (int) [0, 255]  
-    blue (int) [0, 255] --- these are the RGB values for the background '''
-    height = int(window.getHeight() / 10)
-    color = gr.color_rgb(red, green, blue)
-
-    # 10 Rectangles, each with a different color and a different y-coordinate
-    for starting_y in range(0, window.getHeight(), height):
-        rect = gr.Rectangle(gr.Point(0, starting_y), gr.Point(window.getWidth(), starting_y + height))
-        rect.setFill(color)
-        rect.setOutline(color)
-        rect.draw(window)
+    blue (int) [0, 255] --- these are the RGB values for the background 
 
+    OUTPUT
+    pixels (bytearray) - packed RGB pixels, 3 bytes per pixel, row by row'''
+    pixels = bytearray(width * height * 3)
+    black = bytes((0, 0, 0))
+    field = bytes.fromhex("7A7A7A")
+    lines = bytes.fromhex("5C5C5C")
+
+    # 10 stripes, each with a different color and a different y-coordinate
+    stripe = int(height / 10)
+    for starting_y in range(0, height, stripe):
+        fillRect(pixels, width, 0, starting_y, width - 1, min(starting_y + stripe, height) - 1,
+                 bytes((red, green, blue)))
         # Update color
         red = int((red + 230) / 2)
         green = int((green + 230) / 2)
         blue = int((blue + 230) / 2)
-        color = gr.color_rgb(red, green, blue)
-    
-def drawPlayField(window):
-    ''' Creates a 10x20 grid where each space is 20 x 20 pixels 
-    INPUT
-    window (gr.GraphWin) - the graphics window in use'''
-    play_field = gr.Rectangle(gr.Point(300, 200), gr.Point(500, 600))
-    play_field.setFill("#7A7A7A")
-    play_field.draw(window)
 
-    # Create vertical lines
+    # Play field, with a grid line between every space
+    fillRect(pixels, width, 300, 200, 500, 600, black)
+    fillRect(pixels, width, 301, 201, 499, 599, field)
     for x_pos in range(320, 500, 20):
-        point1 = gr.Point(x_pos, 200)
-        point2 = gr.Point(x_pos, 600)
-        line = gr.Line(point1, point2)
-        line.setOutline("#5C5C5C")
-        line.draw(window)
-
-    # Create horizontal lines
+        fillRect(pixels, width, x_pos, 201, x_pos, 599, lines)
     for y_pos in range(220, 600, 20):
-        point1 = gr.Point(300, y_pos)
-        point2 = gr.Point(500, y_pos)
-        line = gr.Line(point1, point2)
-        line.setOutline("#5C5C5C")
-        line.draw(window)
-    
-    # Create "Up Next" space:
-    little_box = gr.Rectangle(gr.Point(505, 200), gr.Point(585, 280))
-    little_box.setFill("#7A7A7A")
+        fillRect(pixels, width, 301, y_pos, 499, y_pos, lines)
+
+    # "Up Next" and "Hold" boxes
+    for x_pos in (505, 215):
+        fillRect(pixels, width, x_pos, 200, x_pos + 80, 280, black)
+        fillRect(pixels, width, x_pos + 1, 201, x_pos + 79, 279, field)
+    return pixels
+
+def drawBackground(window, red, green, blue):
+    '''Draws the gradient background, the play field and the "Up Next"/"Hold" boxes as a
+    single image. The image is saved in the CACHE_FOLDER the first time, and loaded from
+    there in later games (saved backgrounds of other BACKGROUND_VERSIONs are deleted)
+    INPUT
+    window (gr.GraphWin) - the graphics window in use
+    red (int) [0, 255]  
+    green (int) [0, 255]  
+    blue (int) [0, 255] --- these are the RGB values for the background '''
+    width = window.getWidth()
+    height = window.getHeight()
+    center = gr.Point(width / 2, height / 2)
+    prefix = f"background_v{BACKGROUND_VERSION}_"
+    cache_file = os.path.join(CACHE_FOLDER, f"{prefix}{width}x{height}_{red}_{green}_{blue}.ppm")
+    background = None
+    if os.path.exists(cache_file):
+        try:
+            background = gr.Image(center, cache_file)
+        except gr.tk.TclError:
+            background = None   # A broken cache file is made again
+    if background == None:
+        background = gr.Image(center, width, height)
+        background.putPixels(makeBackground(width, height, red, green, blue))
+        try:
+            os.makedirs(CACHE_FOLDER, exist_ok=True)
+            # Backgrounds from other versions will never be loaded again
+            for name in os.listdir(CACHE_FOLDER):
+                if name.startswith("background_") and not name.startswith(prefix):
+                    os.remove(os.path.join(CACHE_FOLDER, name))
+            background.save(cache_file)
+        except (OSError, gr.tk.TclError):
+            pass    # The game still works without a cache, it just draws the background every time
+    background.draw(window)
+
+    # Text can't go into the image, so the two labels stay as their own items
     next_text = gr.Text(gr.Point(545, 210), "NEXT")
     next_text.setTextColor("white")
     next_text.setStyle("italic")
-    little_box.draw(window)
-    next_text.draw(window)
-
-    # Create the "Hold" space:
-    hold_box = gr.Rectangle(gr.Point(215, 200), gr.Point(295, 280))
-    hold_box.setFill("#7A7A7A")
     hold_text = gr.Text(gr.Point(255, 210), "HOLD")
     hold_text.setTextColor("white")
     hold_text.setStyle("italic")
-    hold_box.draw(window)
-    hold_text.draw(window)
+    window.drawAll([next_text, hold_text])
 
 def drawInstructions(window, play_field):
     '''Draw instructional text, rules for game, and waits for user to push key to start 
@@ -358,181 +174,122 @@ def drawInstructions(window, play_field):
     input = window.getKey()
     if input.lower() == "q":
         play_field.gameOver()
-    push_start.undraw()
-    desc_text.undraw()
-    big_pause_box.undraw()
-    control_text.undraw()
-    title.undraw()
+    window.undrawAll([push_start, desc_text, big_pause_box, control_text, title])
 
-def processInput(input, piece, play_field, window):
-    ''' Takes user input as a string and responds appropriately
-    Returns the piece
+def processInput(engine, window, until=None):
+    ''' Takes every key pressed up to a point in time, in the order they were pressed, and
+    responds appropriately
     INPUT
-    input (Str) - user input on keyboard
-    piece (Quadromino) - the current active piece in play
-    play_field (PlayGrid) - the main PlayGrid being used for the game
+    engine (Engine) - the game being played
     window (gr.GraphWin) - the graphics window in use
-    
-    OUTPUT
-    piece (Quadromino) - an updated version of the piece in play'''
-    if input == "w":
-        piece.hardDrop(play_field)
-        play_field.clearLines(window)
-        piece = useNextQuadromino(window, play_field)
-    elif input == "a":
-        piece.move(-1, 0, play_field)
-    elif input == "s":
-        piece.move(0, 1, play_field)
-    elif input == "d":
-        piece.move(1, 0, play_field)
-    # Left/Right for movement
-    elif input == "Right" or input == "m":
-        piece.rotate(1, play_field)
-    elif input == "Left" or input == "n":
-        piece.rotate(-1, play_field)
-    elif input == "e":
-        piece = play_field.holdQuadromino(piece, window)
-    elif input == "Escape":
-        drawInstructions(window, play_field)
-
-    return piece
+    until (float) - only keys pressed at or before this time.perf_counter() time are used
 
-def useNextQuadromino(window, play_field):
-    '''Draws and updates the next piece to be used
-    INPUT
-    window (gr.GraphWin) - the graphics window in use
-    play_field (PlayGrid) - the game's PlayGrid
-    
     OUTPUT
-    piece (Quadromino) - the next piece to be used in active play '''
-    piece = play_field.getNextQuadromino(window)
-    piece.draw(window)
-    return piece
-
-def fallPiece(piece, play_field, lock_length, lock_time):
-    ''' Make piece fall / deposit piece if it has collided at the bottom
+    paused (bool) - True if the game was paused (keys pressed after Escape are dropped)'''
+    for input, pressed in window.drainKeys(until):
+        if input == "Escape":
+            drawInstructions(window, engine.play_field)
+            return True
+        engine.processInput(input)
+        # Keys pressed after the one that ended the game are dropped
+        if not engine.gameActive():
+            break
+    return False
+
+# The most time one frame is allowed to catch up on. If the window stalls for longer (it was
+# dragged, the computer was busy) the game slows down instead of running a burst of ticks
+MAX_FRAME_TIME = 0.25
+
+
+def main(renderer_class=TkRenderer, timing=False, player=None):
+    ''' Plays a game of Quadtris
     INPUT
-    piece (Quadromino): the active Quadromino object
-    play_field (PlayGrid): the current grid in use
-    lock_length (float): How mamy seconds the piece has before it locks after landing
-    lock_time (float): a variable used to allow the player some movement before the 
-                    piece deposits after colliding. The time the piece should lock.
-                    
-    OUTPUT:
-    lock_time (float): the updated lock_time '''
-    # If the piece can fall, lower it by a block and reset lock_stage
-    if piece.checkMove(0, 1, play_field):
-        piece.move(0, 1, play_field)
-        lock_time = time.time() + lock_length
-
-    return lock_time
-    
-def updateStats(score_txt, lines_txt, lvl_txt, score, lines, level):
-    ''' Updates the score, nummber of lines cleared, and level on the GUI
-    INPUT
-    x_txt vairables should be (gr.Text) objects to display information
-    other variables should be (int)s that contain the information to display'''
-    score_txt.setText("SCORE: " + str(score))
-    lines_txt.setText("Lines\t    \nCleared: " + str(lines))
-    lvl_txt.setText("LVL: " + str(level))
-
-def main():
-    # Tuple of tuples with (level, cycle_length, line_req) variables
-    # level: which level the player is on
-    # cycle length: how many frames per cycle/gravity fall
-    # line req: how many lines must be cleared to advance to this level
-    level_guide = ( (1, 60, 0), 
-                    (2, 50, 10), 
-                    (3, 40, 20), 
-                    (4, 30, 30), 
-                    (5, 25, 40), 
-                    (6, 20, 50),
-                    (7, 15, 60), 
-                    (8, 10, 70), 
-                    (9, 5, 80), 
-                    (10, 3, 90),
-                    (11, 2, 100),
-                    (12, 1, 110) )
-
-    # Cycle variable to update on a timer (used for auto-falling)
-    cycle_stage = 1
-    level = 1
-    cycle_length = level_guide[level - 1][1]
-
-    # Lock variable to allow for player movement after piece hit ground for a while
-    lock_time = 0       # The time the piece will lock (updates after each fall)
-    lock_length = 0.5    # How many seconds the player has from the piece landing to its lock time
-
-    # Create a 10 x 20 grid, a window, a play field, and Quadrominos
+    renderer_class (class) - TkRenderer, or ImageRenderer to draw the play field as one image
+    timing (bool) - True times every phase of a frame, shows the statistics on screen while
+                    playing and prints them when the game is over
+    player - a policy (see simulate.py) that plays instead of the keyboard, like bot.HeuristicBot.
+             Escape still pauses the game'''
+    # Create a window and a game with a 10 x 20 grid
     win = gr.GraphWin("Quadtris (esc to pause)", 800, 800, autoflush = False)
-    play_field = PlayGrid(10, 20)
-    play_field.replenishQuadrominos()
+    engine = Engine(10, 20)
+    timer = None
+    if timing:
+        timer = PhaseTimer()
+        engine.timer = timer
     
     # Draw and create GUI visuals
-    drawGradient(win, 0, 255, 102)   
-    drawPlayField(win)
-    play_field.showUpNext(win)
-    level_txt = gr.Text(gr.Point(535, 555), "LVL: " + str(level))
-    level_txt.draw(win)
-    num_line_txt = gr.Text(gr.Point(555, 585), "Lines\t    \nCleared: 0")
-    num_line_txt.draw(win)
-    score_txt = gr.Text(gr.Point(400, 620), "SCORE: 0")
-    score_txt.draw(win)
+    drawBackground(win, 0, 255, 102)
+    renderer = renderer_class(win, engine.play_field)
+    engine.addObserver(renderer)
+    timing_txt = None
+    if timing:
+        timing_txt = gr.Text(gr.Point(400, 720), "")
+        timing_txt.setFace("courier")
+        timing_txt.setSize(8)
+        timing_txt.draw(win)
+    frames = 0
 
     # Draw title/pause screen, then play game!
-    drawInstructions(win, play_field)
-    piece = useNextQuadromino(win, play_field)
-
-    # Get key press
-    keyIn = win.checkKey()
+    drawInstructions(win, engine.play_field)
+    engine.start()
+
+    # The game runs in fixed ticks of TICK_LENGTH seconds. Every frame the real time that passed
+    # is added to lag, and one tick is run for every TICK_LENGTH of it. Drawing can take as long
+    # as it needs (or skip frames) without changing how fast the game plays.
+    # Each tick handles the keys that were pressed before the moment in time it stands for
+    previous = time.perf_counter()
+    lag = 0.0
     # Until the game if over, respond appropriately to user input, update window, and get new input
-    while play_field.gameActive():
-        piece = processInput(keyIn, piece, play_field, win)
-
-        # Update ghost projection and cycle count
-        piece.projectGhost(play_field)
-        
-
-        # action at end of cycle
-        if cycle_stage > cycle_length:
-            cycle_stage = 1
-            # Gravity / locking the piece in place
-            lock_time = fallPiece(piece, play_field, lock_length, lock_time)
-            # If the lock time has been reached, deposit the piece
-            if time.time() >= lock_time:
-                piece.depositQuadromino(play_field)
-                play_field.clearLines(win)
-                piece = useNextQuadromino(win, play_field)
-
-            # Increase level / speed at different increments of line clears, based on the level_guide
-            num_lines = play_field.getNumLines()
-            if level < len(level_guide):
-                line_req = level_guide[level][2]
-                if num_lines >= line_req:
-                    cycle_length = level_guide[level][1]
-                    level = level_guide[level][0]
-            # Update GUI/Text
-            updateStats(score_txt, num_line_txt, level_txt, play_field.getScore(), num_lines, level)
+    while engine.gameActive():
+        now = time.perf_counter()
+        lag = min(lag + now - previous, MAX_FRAME_TIME)
+        previous = now
+        while lag >= TICK_LENGTH and engine.gameActive():
+            lag -= TICK_LENGTH
+            start = time.perf_counter()
+            if processInput(engine, win, now - lag):
+                # Time spent paused doesn't count
+                previous = time.perf_counter()
+                lag = 0.0
+                break
+            if timer != None:
+                timer.add("processInput", time.perf_counter() - start)
+            if player != None:
+                key = engine.timed("player", player.nextInput, engine)
+                if key != None:
+                    engine.processInput(key)
+            engine.update()
+        engine.timed("render", renderer.animate)
+
+        # Refresh the timing statistics twice a second
+        frames += 1
+        if timing_txt != None and frames % 30 == 0:
+            timing_txt.setText(timer.report())
         
-        # Update input, window, and cycle
-        cycle_stage += 1
-        win.update()
-        time.sleep(0.016)   # Roughly 60fps maximum
-        keyIn = win.checkKey()
-
-    # Game is now over. Display results and clear board
-    piece.undraw()
-    time.sleep(0.25)
-    gg_txt = gr.Text(gr.Point(400, 100), f"GAME OVER\nScore: {play_field.getScore()}\nClick to close window.")
-    gg_txt.setSize(20)
-    gg_txt.draw(win)
-
-    for i in range(20):
-        play_field.clearRow(19)
-        time.sleep(0.1)
+        # Update input and window, then wait for the next tick to be due
+        engine.timed("win.update", win.update)
+        time.sleep(max(0.0, TICK_LENGTH - lag - (time.perf_counter() - previous)))
+
+    # Game is now over. Display results and clear board, keeping the window responsive
+    renderer.gameEnded(engine.play_field.getScore())
+    while renderer.animating():
+        renderer.animate()
         win.update()
+        time.sleep(TICK_LENGTH)
+        win.drainKeys()
 
+    if timer != None:
+        print(timer.report())
     keyIn = win.getMouse()
 
 if __name__ == "__main__":
-    main()
+    # "py game.py --image" draws the play field as a single image,
+    # "py game.py --timing" shows how long each phase of a frame takes,
+    # "py game.py --ai" lets the computer play (see bot.py)
+    player = None
+    if "--ai" in sys.argv:
+        player = HeuristicBot()
+    if "--image" in sys.argv:
+        main(ImageRenderer, "--timing" in sys.argv, player)
+    else:
+        main(TkRenderer, "--timing" in sys.argv, player)
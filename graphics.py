@@ -62,6 +62,31 @@ http://mcsp.wartburg.edu/zelle/python for a quick reference"""
 
 __version__ = "5.0"
 
+# Quadtris changes on top of version 5
+#     * The Tk root is created by the first GraphWin (or Entry/Image)
+#       instead of at import time. Point, Rectangle, color_rgb, etc. are
+#       plain data objects until then, so the module imports without a
+#       display.
+#     * GraphicsObject.setColors changes fill and outline with one Tk
+#       call, and only sends the two options that changed.
+#     * GraphWin keeps its drawn items in a dict keyed by Tk id, so
+#       undraw no longer searches a list. drawAll, undrawAll and moveAll
+#       work on many objects at once: undrawAll deletes them all with
+#       one Tk call, and all three update the window only once.
+#       undraw and undrawAll both call _undrawn on every object they
+#       remove, which is where an Image lets go of its cached photo.
+#     * GraphicsObjects can have canvas tags (addTag/removeTag), and
+#       GraphWin.moveTag moves every object with a tag in one Tk call.
+#     * Every key press is queued with its time, so keys pressed between
+#       two checks are no longer lost. drainKeys returns them in order.
+#       The queue holds the newest MAX_QUEUED_KEYS, and getKey and
+#       checkKey empty it, so programs that never drain it don't grow it.
+#     * Image.putPixels and Image.getPixels write and read a whole
+#       rectangle of pixels as a packed RGB buffer with one Tk call.
+#     * setCoords converts the points of every drawn item in one batch
+#       (Transform.screenAll) and moves the items with coords instead
+#       of undrawing and redrawing them.
+
 # Version 5 8/26/2016
 #     * update at bottom to fix MacOS issue causing askopenfile() to hang
 #     * update takes an optional parameter specifying update rate
@@ -161,6 +186,7 @@ __version__ = "5.0"
 #     Added Entry boxes.
 
 import time, os, sys
+from collections import deque
 
 try:  # import as appropriate for 2.x vs. 3.x
    import tkinter as tk
@@ -182,13 +208,26 @@ BAD_OPTION = "Illegal option value"
 ##########################################################################
 # global variables and funtions
 
-_root = tk.Tk()
-_root.withdraw()
+_root = None
+
+def _getRoot():
+    """Return the shared Tk root, creating it on first use"""
+    global _root
+    if _root is None:
+        _root = tk.Tk()
+        _root.withdraw()
+        # MacOS fix 1
+        _root.update()
+    return _root
+
+# The most key presses a GraphWin keeps queued, oldest are dropped first
+MAX_QUEUED_KEYS = 256
 
 _update_lasttime = time.time()
 
 def update(rate=None):
     global _update_lasttime
+    if _root is None: return # nothing has been drawn yet
     if rate:
         now = time.time()
         pauseLength = 1/rate-(now-_update_lasttime)
@@ -210,7 +249,7 @@ class GraphWin(tk.Canvas):
     def __init__(self, title="Graphics Window",
                  width=200, height=200, autoflush=True):
         assert type(title) == type(""), "Title must be a string"
-        master = tk.Toplevel(_root)
+        master = tk.Toplevel(_getRoot())
         master.protocol("WM_DELETE_WINDOW", self.close)
         tk.Canvas.__init__(self, master, width=width, height=height,
                            highlightthickness=0, bd=0)
@@ -218,7 +257,8 @@ class GraphWin(tk.Canvas):
         self.pack()
         master.resizable(0,0)
         self.foreground = "black"
-        self.items = []
+        self.items = {}     # Tk id -> drawn GraphicsObject
+        self.tagged = {}    # tag -> {Tk id -> drawn GraphicsObject with that tag}
         self.mouseX = None
         self.mouseY = None
         self.bind("<Button-1>", self._onClick)
@@ -231,6 +271,9 @@ class GraphWin(tk.Canvas):
         self.closed = False
         master.lift()
         self.lastKey = ""
+        # (keysym, time.perf_counter() when pressed) for every key event. Only the newest
+        # MAX_QUEUED_KEYS are kept, for programs that never take keys out of the queue
+        self.keys = deque(maxlen=MAX_QUEUED_KEYS)
         if autoflush: _root.update()
 
     def __repr__(self):
@@ -250,6 +293,7 @@ class GraphWin(tk.Canvas):
 
     def _onKey(self, evnt):
         self.lastKey = evnt.keysym
+        self.keys.append((evnt.keysym, time.perf_counter()))
 
 
     def setBackground(self, color):
@@ -262,7 +306,7 @@ class GraphWin(tk.Canvas):
         """Set coordinates of window to run from (x1,y1) in the
         lower-left corner to (x2,y2) in the upper-right corner."""
         self.trans = Transform(self.width, self.height, x1, y1, x2, y2)
-        self.redraw()
+        self.retransform()
 
     def close(self):
         """Close the window"""
@@ -337,12 +381,13 @@ class GraphWin(tk.Canvas):
     def getKey(self):
         """Wait for user to press a key and return it as a string."""
         self.lastKey = ""
-        while self.lastKey == "":
+        self.keys.clear()
+        while not self.keys:
             self.update()
             if self.isClosed(): raise GraphicsError("getKey in closed window")
             time.sleep(.1) # give up thread
 
-        key = self.lastKey
+        key = self.keys.popleft()[0]
         self.lastKey = ""
         return key
 
@@ -353,7 +398,20 @@ class GraphWin(tk.Canvas):
         self.update()
         key = self.lastKey
         self.lastKey = ""
+        self.keys.clear()
         return key
+
+    def drainKeys(self, until=None):
+        """Return every key pressed so far, oldest first, as a list of
+        (key, time) pairs where time is the time.perf_counter() of the
+        key press. The keys are removed from the queue. If until is
+        given, only keys pressed at or before that time are returned"""
+        if self.isClosed():
+            raise GraphicsError("drainKeys in closed window")
+        keys = []
+        while self.keys and (until is None or self.keys[0][1] <= until):
+            keys.append(self.keys.popleft())
+        return keys
             
     def getHeight(self):
         """Return the height of the window"""
@@ -370,6 +428,15 @@ class GraphWin(tk.Canvas):
         else:
             return x,y
                       
+    def toScreenAll(self, coords):
+        """Returns a flat list [x0,y0,x1,y1,...] of world coordinates
+        as screen coordinates, converted all at once"""
+        trans = self.trans
+        if trans:
+            return trans.screenAll(coords)
+        else:
+            return list(coords)
+
     def toWorld(self, x, y):
         trans = self.trans
         if trans:
@@ -387,16 +454,107 @@ class GraphWin(tk.Canvas):
             self._mouseCallback(Point(e.x, e.y))
 
     def addItem(self, item):
-        self.items.append(item)
+        self.items[item.id] = item
+        if item.tags:
+            self.itemconfig(item.id, tags=tuple(item.tags))
+            for tag in item.tags:
+                self.tagged.setdefault(tag, {})[item.id] = item
 
     def delItem(self, item):
-        self.items.remove(item)
+        self.items.pop(item.id, None)
+        for tag in item.tags:
+            self.tagged[tag].pop(item.id, None)
+
+    def drawAll(self, objects):
+        """Draw every GraphicsObject in objects, updating the window
+        only once at the end. Returns objects"""
+        self.__checkOpen()
+        for obj in objects:
+            if obj.canvas and not obj.canvas.isClosed():
+                raise GraphicsError(OBJ_ALREADY_DRAWN)
+        for obj in objects:
+            obj.canvas = self
+            obj.id = obj._draw(self, obj.config)
+            self.addItem(obj)
+        self.__autoflush()
+        return objects
+
+    def undrawAll(self, objects):
+        """Undraw every object in objects that is drawn in this window,
+        deleting them all with a single Tk call"""
+        ids = []
+        for obj in objects:
+            if obj.canvas is self:
+                ids.append(obj.id)
+                self.delItem(obj)
+                obj.canvas = None
+                obj.id = None
+                obj._undrawn()
+        if ids and not self.closed:
+            self.delete(*ids)
+            self.__autoflush()
+
+    def moveAll(self, objects, dx, dy):
+        """Move every object in objects dx units in x direction and dy
+        units in y direction, updating the window only once"""
+        if self.trans:
+            x = dx / self.trans.xscale
+            y = -dy / self.trans.yscale
+        else:
+            x = dx
+            y = dy
+        for obj in objects:
+            obj._move(dx, dy)
+            if obj.canvas is self and not self.closed:
+                self.move(obj.id, x, y)
+        if not self.closed:
+            self.__autoflush()
+
+    def moveTag(self, tag, dx, dy):
+        """Move every drawn object with the given tag dx units in x
+        direction and dy units in y direction, with a single Tk call"""
+        self.__checkOpen()
+        if self.trans:
+            x = dx / self.trans.xscale
+            y = -dy / self.trans.yscale
+        else:
+            x = dx
+            y = dy
+        for obj in self.tagged.get(tag, {}).values():
+            obj._move(dx, dy)
+        self.move(tag, x, y)
+        self.__autoflush()
 
     def redraw(self):
-        for item in self.items[:]:
+        for item in list(self.items.values()):
             item.undraw()
             item.draw(self)
         self.update()
+
+    def retransform(self):
+        """Moves every drawn item to where the current coordinates put
+        it. The points of all items are converted in one batch and the
+        canvas items are updated in place with coords, only objects
+        that can't be (see GraphicsObject._points) are redrawn"""
+        movable = []
+        world = []
+        for item in list(self.items.values()):
+            points = item._points()
+            if points is None:
+                item.undraw()
+                item.draw(self)
+            else:
+                movable.append((item, len(points)))
+                for p in points:
+                    world.append(p.x)
+                    world.append(p.y)
+        screen = self.toScreenAll(world)
+        start = 0
+        for item, count in movable:
+            end = start + 2 * count
+            self.coords(item.id, *item._coords(screen[start:end]))
+            start = end
+        self.update()
         
                       
 class Transform:
@@ -420,6 +578,16 @@ class Transform:
         ys = (self.ybase-y) / self.yscale
         return int(xs+0.5),int(ys+0.5)
         
+    def screenAll(self, coords):
+        # Returns a flat list [x0,y0,x1,y1,...] in screen coordinates,
+        # converting every x and then every y in one pass each
+        xbase, ybase = self.xbase, self.ybase
+        xscale, yscale = self.xscale, self.yscale
+        screen = [0] * len(coords)
+        screen[0::2] = [int((x-xbase) / xscale + 0.5) for x in coords[0::2]]
+        screen[1::2] = [int((ybase-y) / yscale + 0.5) for y in coords[1::2]]
+        return screen
+
     def world(self,xs,ys):
         # Returns xs,ys in world coordinates
         x = xs*self.xscale + self.xbase
@@ -452,6 +620,8 @@ class GraphicsObject:
         #    drawn shape.
         self.canvas = None
         self.id = None
+        # Canvas tags of the object, see addTag and GraphWin.moveTag
+        self.tags = []
 
         # config is the dictionary of configuration options for the widget.
         config = {}
@@ -471,6 +641,35 @@ class GraphicsObject:
         """Set line weight to width"""
         self._reconfig("width", width)
 
+    def setColors(self, fill, outline):
+        """Set interior color to fill and outline color to outline
+        with a single Tk call"""
+        if "fill" not in self.config or "outline" not in self.config:
+            raise GraphicsError(UNSUPPORTED_METHOD)
+        self.config["fill"] = fill
+        self.config["outline"] = outline
+        if self.canvas and not self.canvas.isClosed():
+            self.canvas.itemconfig(self.id, fill=fill, outline=outline)
+            if self.canvas.autoflush:
+                _root.update()
+
+    def addTag(self, tag):
+        """Add the canvas tag tag to the object. Every object with the
+        same tag can be moved at once by GraphWin.moveTag"""
+        if tag in self.tags: return
+        self.tags.append(tag)
+        if self.canvas and not self.canvas.isClosed():
+            self.canvas.addtag_withtag(tag, self.id)
+            self.canvas.tagged.setdefault(tag, {})[self.id] = self
+
+    def removeTag(self, tag):
+        """Remove the canvas tag tag from the object"""
+        if tag not in self.tags: return
+        self.tags.remove(tag)
+        if self.canvas and not self.canvas.isClosed():
+            self.canvas.dtag(self.id, tag)
+            self.canvas.tagged[tag].pop(self.id, None)
+
     def draw(self, graphwin):
 
         """Draw the object in graphwin, which should be a GraphWin
@@ -501,6 +700,13 @@ class GraphicsObject:
                 _root.update()
         self.canvas = None
         self.id = None
+        self._undrawn()
+
+    def _undrawn(self):
+        """Called after the object is undrawn, by undraw or
+        GraphWin.undrawAll. Lets subclasses let go of what they only
+        need while drawn"""
+        pass
 
 
     def move(self, dx, dy):
@@ -541,6 +747,17 @@ class GraphicsObject:
         Returns Tk id of item drawn"""
         pass # must override in subclass
 
+    def _points(self):
+        """Returns the list of Points the drawn figure is placed by, so
+        GraphWin.setCoords can move it with coords. None means the
+        object has to be redrawn instead"""
+        return None
+
+    def _coords(self, screen):
+        """Returns the Tk coords of the figure, given the screen
+        coordinates of _points() as a flat list"""
+        return screen
+
 
     def _move(self, dx, dy):
         """updates internal state of object to move it dx,dy units"""
@@ -564,6 +781,13 @@ class Point(GraphicsObject):
     def _move(self, dx, dy):
         self.x = self.x + dx
         self.y = self.y + dy
+
+    def _points(self):
+        return [self]
+
+    def _coords(self, screen):
+        x,y = screen
+        return [x,y,x+1,y+1]
         
     def clone(self):
         other = Point(self.x,self.y)
@@ -587,6 +811,9 @@ class _BBox(GraphicsObject):
         self.p1.y = self.p1.y + dy
         self.p2.x = self.p2.x + dx
         self.p2.y = self.p2.y  + dy
+
+    def _points(self):
+        return [self.p1, self.p2]
                 
     def getP1(self): return self.p1.clone()
 
@@ -711,13 +938,16 @@ class Polygon(GraphicsObject):
     def _move(self, dx, dy):
         for p in self.points:
             p.move(dx,dy)
+
+    def _points(self):
+        return self.points
    
     def _draw(self, canvas, options):
-        args = [canvas]
+        world = []
         for p in self.points:
-            x,y = canvas.toScreen(p.x,p.y)
-            args.append(x)
-            args.append(y)
+            world.append(p.x)
+            world.append(p.y)
+        args = [canvas] + canvas.toScreenAll(world)
         args.append(options)
         return GraphWin.create_polygon(*args) 
 
@@ -740,6 +970,9 @@ class Text(GraphicsObject):
         
     def _move(self, dx, dy):
         self.anchor.move(dx,dy)
+
+    def _points(self):
+        return [self.anchor]
         
     def clone(self):
         other = Text(self.anchor, self.config['text'])
@@ -787,7 +1020,7 @@ class Entry(GraphicsObject):
         self.anchor = p.clone()
         #print self.anchor
         self.width = width
-        self.text = tk.StringVar(_root)
+        self.text = tk.StringVar(_getRoot())
         self.text.set("")
         self.fill = "gray"
         self.color = "black"
@@ -818,6 +1051,9 @@ class Entry(GraphicsObject):
     def _move(self, dx, dy):
         self.anchor.move(dx,dy)
 
+    def _points(self):
+        return [self.anchor]
+
     def getAnchor(self):
         return self.anchor.clone()
 
@@ -882,10 +1118,10 @@ class Image(GraphicsObject):
         self.imageId = Image.idCount
         Image.idCount = Image.idCount + 1
         if len(pixmap) == 1: # file name provided
-            self.img = tk.PhotoImage(file=pixmap[0], master=_root)
+            self.img = tk.PhotoImage(file=pixmap[0], master=_getRoot())
         else: # width and height provided
             width, height = pixmap
-            self.img = tk.PhotoImage(master=_root, width=width, height=height)
+            self.img = tk.PhotoImage(master=_getRoot(), width=width, height=height)
 
     def __repr__(self):
         return "Image({}, {}, {})".format(self.anchor, self.getWidth(), self.getHeight())
@@ -898,13 +1134,15 @@ class Image(GraphicsObject):
     
     def _move(self, dx, dy):
         self.anchor.move(dx,dy)
+
+    def _points(self):
+        return [self.anchor]
         
-    def undraw(self):
+    def _undrawn(self):
         try:
             del self.imageCache[self.imageId]  # allow gc of tk photoimage
         except KeyError:
             pass
-        GraphicsObject.undraw(self)
 
     def getAnchor(self):
         return self.anchor.clone()
@@ -943,6 +1181,69 @@ class Image(GraphicsObject):
         
         """
         self.img.put("{" + color +"}", (x, y))
+
+    def putPixels(self, pixels, x=0, y=0, width=None, height=None):
+        """Writes a width x height rectangle of pixels with its top left
+        corner at (x,y), with a single Tk call. pixels is a packed RGB
+        buffer (bytes, bytearray, array("B"), memoryview, or a NumPy
+        uint8 array), 3 bytes per pixel, row by row. With no size given
+        the buffer fills the whole image, so a prepared frame loads in
+        one call
+
+        """
+        if width is None: width = self.getWidth() - x
+        if height is None: height = self.getHeight() - y
+        view = memoryview(pixels)
+        if not view.c_contiguous:
+            view = memoryview(view.tobytes())
+        view = view.cast("B")
+        if len(view) != width * height * 3:
+            raise GraphicsError(BAD_OPTION)
+        # Binary PPM data goes to Tk as is, without making a string per pixel
+        header = "P6 {} {} 255\n".format(width, height).encode("ascii")
+        try:
+            self.img.tk.call(self.img.name, "put", header + view,
+                             "-format", "ppm", "-to", x, y)
+        except tk.TclError:
+            # Older Tk versions only take image data as text
+            hexdata = view.hex()
+            rows = []
+            for row in range(height):
+                start = row * width * 6
+                rows.append("{" + " ".join(["#" + hexdata[i:i+6] for i in
+                            range(start, start + width * 6, 6)]) + "}")
+            self.img.put(" ".join(rows), (x, y))
+
+    def getPixels(self, x=0, y=0, width=None, height=None, kind="bytes"):
+        """Returns a width x height rectangle of pixels with its top left
+        corner at (x,y), read with a single Tk call, as a packed RGB buffer
+        (3 bytes per pixel, row by row). kind picks the type returned:
+        "bytes", "array" (array("B")) or "numpy" (a height x width x 3
+        uint8 array, NumPy must be installed). With no size given the
+        rest of the image is returned
+
+        """
+        if width is None: width = self.getWidth() - x
+        if height is None: height = self.getHeight() - y
+        data = self.img.tk.call(self.img.name, "data",
+                                "-from", x, y, x + width, y + height)
+        # data is rows of "#rrggbb" colors, turned into bytes all at once
+        hexdata = []
+        for row in self.img.tk.splitlist(data):
+            hexdata.extend([color[1:7] for color in self.img.tk.splitlist(row)])
+        pixels = bytes.fromhex("".join(hexdata))
+        if kind == "bytes":
+            return pixels
+        elif kind == "array":
+            import array
+            return array.array("B", pixels)
+        elif kind == "numpy":
+            try:
+                import numpy
+            except ImportError:
+                raise GraphicsError("getPixels(kind=\"numpy\") needs NumPy installed")
+            return numpy.frombuffer(pixels, dtype=numpy.uint8).reshape(height, width, 3)
+        raise GraphicsError(BAD_OPTION)
         
 
     def save(self, filename):
@@ -1008,8 +1309,7 @@ def test():
 #MacOS fix 2
 #tk.Toplevel(_root).destroy()
 
-# MacOS fix 1
-update()
+# MacOS fix 1 now runs when the root is created (see _getRoot)
 
 if __name__ == "__main__":
     test()
@@ -0,0 +1,262 @@
+# placements.py
+#  -finds every place a piece can end up, for bots. Starting from where the piece is now, the
+#   search tries every move a player can make (left, right, soft drop, both rotations) under the
+#   same rules as Quadromino.move and Quadromino.rotate, so it finds tucks under overhangs and
+#   spins as well as plain drops. Every placement comes with the keys that take the piece there.
+#
+#   The search is fast enough to run for every piece: instead of looking at one row at a time,
+#   it keeps the rows a piece fits in as one int per (orientation, column), bit r set when the
+#   piece fits with square1 in row r, and lets the piece fall through all the free rows at once.
+
+
+# Rows above the grid a piece can be in (rotations can lift square1 above row 0)
+ROWS_ABOVE = 8
+# How many columns past each wall square1 can go. Above the grid the game lets a piece go as far
+# sideways as it likes, but wherever it lands out there the game is over, so the search stops here
+REACH = 2
+# Columns of wall kept on each side of the grid (the search looks at most 4 columns either side
+# of square1)
+PADDING = REACH + 4
+
+
+class Placement():
+    ''' A place a piece can come to rest, and how to get it there '''
+    def __init__(self, orientation, col, row, inputs, spaces):
+        ''' INPUT
+        orientation (int) - the piece's orientation when it lands
+        col (int), row (int) - where square1 lands
+        inputs (Str) - the keys (for Engine.processInput) that take the piece there from where
+                       it started, one character each. The last one is always "w" (hard drop)
+        spaces (tuple of (col, row) tuples) - the spaces the piece fills, sorted'''
+        self.orientation = orientation
+        self.col = col
+        self.row = row
+        self.inputs = inputs
+        self.spaces = spaces
+
+    def __repr__(self):
+        return f"Placement(orientation={self.orientation}, col={self.col}, row={self.row}, inputs={self.inputs!r})"
+
+
+class PlacementSearch():
+    ''' One search for where a piece can go on a grid. Use findPlacements() rather than this class '''
+    def __init__(self, shape, grid, columns=None):
+        ''' INPUT
+        shape (class) - the piece's Quadromino class
+        grid (PlayGrid) - the grid the piece is moving in
+        columns (list of int) - columnMasks(grid), if the caller has them already'''
+        self.shape = shape
+        self.tables = shapeTables(shape)
+        num_rows = grid.num_rows
+        # Bit (row + ROWS_ABOVE) stands for row. Every row from the bottom of the grid down is
+        # filled, and so is every space in the walls from row 0 down (above the grid is free).
+        # Columns are numbered from PADDING columns left of the grid, so pieces poking out of the
+        # sides still land on a wall
+        self.all_rows = (1 << (num_rows + ROWS_ABOVE)) - 1
+        wall = (0b1111 << (num_rows + ROWS_ABOVE)) | (((1 << num_rows) - 1) << ROWS_ABOVE)
+        if columns == None:
+            columns = columnMasks(grid)
+        self.columns = [wall] * PADDING + columns + [wall] * PADDING
+        width = len(self.columns)
+        # fits[spaces number][col] -> rows where those spaces are all free, None until needed
+        self.fits = [[None] * width for spaces in self.tables.spaces]
+        # visited[orientation][col] -> rows the search has already reached. Columns further than
+        # REACH past the walls count as reached in every row, so the search never goes there
+        self.lowest = PADDING - REACH
+        self.highest = width - 1 - self.lowest
+        out_of_reach = [-1] * self.lowest
+        reachable = [0] * (width - 2 * self.lowest)
+        self.visited = {orientation: out_of_reach + reachable + out_of_reach for orientation in shape.offsets}
+
+    def freeRows(self, number, col):
+        ''' Returns the rows (bits, see above) where every one of the spaces with the given number
+        (see ShapeTables) is free when square1 is in column col, by the same rules as
+        PlayGrid.anyOccupied. Worked out the first time, then kept in self.fits
+        INPUT
+        number (int) - which spaces to check, relative to square1
+        col (int) - square1's column, counted from PADDING columns left of the grid'''
+        blocked = 0
+        for dc, dr in self.tables.spaces[number]:
+            filled = self.columns[col + dc]
+            blocked |= filled >> dr if dr >= 0 else filled << -dr
+        free = self.all_rows & ~blocked
+        self.fits[number][col] = free
+        return free
+
+    def search(self, orientation, col, row):
+        ''' Returns every placement reachable from square1 at (col, row) in the given orientation
+        (list of Placement), in the order they were found '''
+        tables = self.tables
+        moves = tables.moves
+        landings = tables.landings
+        fits = self.fits
+        visited = self.visited
+        col += PADDING
+        if col < self.lowest or col > self.highest:
+            return []
+        number = tables.offsets[orientation]
+        free = fits[number][col]
+        if free == None:
+            free = self.freeRows(number, col)
+        if not (free >> (row + ROWS_ABOVE)) & 1:
+            return []
+        placements = {}
+        # Every entry in the queue is a spot the piece can be moved into, how far it can fall
+        # from there and the keys that take it there
+        queue = []
+        self.enter(queue, orientation, col, 1 << (row + ROWS_ABOVE), row, "", "")
+        for orientation, col, row, fall, inputs in queue:
+            # Shapes that look the same in different orientations (O, I, S, Z) land in the same
+            # spaces more than one way, only the first way there is kept
+            outline, dcol, drow = landings[orientation]
+            landing = (outline, col + dcol, row + fall + drow)
+            if landing not in placements:
+                left = col + dcol - PADDING
+                spaces = tuple([(left + dc, landing[2] + dr) for dc, dr in tables.outlines[outline]])
+                placements[landing] = Placement(orientation, col - PADDING, row + fall, inputs + "w", spaces)
+
+            # Everywhere on the way down, the piece can move sideways or rotate
+            falling = ((1 << (fall + 1)) - 1) << (row + ROWS_ABOVE)
+            for key, new_orientation, check_col, number, dc, dr in moves[orientation]:
+                moved = falling << dr if dr >= 0 else falling >> -dr
+                new = moved & ~visited[new_orientation][col + dc]
+                if not new:
+                    continue    # Already been everywhere this move could take the piece
+                free = fits[number][col + check_col]
+                if free == None:
+                    free = self.freeRows(number, col + check_col)
+                reached = new & (free << dr if dr >= 0 else free >> -dr)
+                if reached:
+                    self.enter(queue, new_orientation, col + dc, reached, row + dr, inputs, key)
+        return list(placements.values())
+
+    def enter(self, queue, orientation, col, reached, start, inputs, key):
+        ''' Adds the spots in reached (rows, see above) the search hasn't been to yet to the queue.
+        Only the top row of each group of new rows is added, the piece falls through the rest
+        INPUT
+        queue (list) - the search queue
+        orientation (int), col (int) - where the piece is moved to
+        reached (int) - the rows it can be moved into, as bits
+        start (int) - the row the move puts square1 in when it is made where the fall started
+        inputs (Str), key (Str) - the keys pressed so far and the key that makes this move'''
+        visited = self.visited[orientation][col]
+        new = reached & ~visited
+        number = self.tables.offsets[orientation]
+        free = self.fits[number][col]
+        if free == None:
+            free = self.freeRows(number, col)
+        blocked = ~free
+        while new:
+            top = new & -new
+            row = top.bit_length() - 1 - ROWS_ABOVE
+            # The piece falls until the first row it doesn't fit in
+            below = blocked >> (row + ROWS_ABOVE)
+            fall = (below & -below).bit_length() - 2
+            # Soft drop to the row the move is made from, then make the move
+            queue.append((orientation, col, row, fall, inputs + "s" * (row - start) + key))
+            visited |= ((1 << (fall + 1)) - 1) << (row + ROWS_ABOVE)
+            new &= ~visited
+        self.visited[orientation][col] = visited
+
+
+class ShapeTables():
+    ''' What the search needs to know about one shape of piece. Use shapeTables() rather than this class '''
+    def __init__(self, shape):
+        ''' INPUT
+        shape (class) - a Quadromino class'''
+        # Every set of spaces a search checks, numbered so that searches can keep what they
+        # found about them in lists
+        self.spaces = []
+        self.numbers = {}   # spaces -> their number
+
+        self.offsets = {}   # orientation -> the number of the spaces the piece fills
+        # orientation -> a (key, new orientation, column to check from, number of the spaces to
+        # check, column change, row change) tuple for every key that moves the piece. A sideways
+        # move checks the piece's own spaces one column over, a rotation checks its rotation_table
+        # spaces where it is and then kicks. Rotations that leave the piece as it was are left out
+        self.moves = {}
+        # The spaces the piece fills in each orientation, sorted and moved so the first one is
+        # (0, 0). Orientations that look the same (O, I, S, Z) share one
+        self.outlines = []
+        # orientation -> (number of its outline, dcol, drow), where dcol and drow say where the
+        # first space of the outline is from square1
+        self.landings = {}
+        for orientation, spaces in shape.offsets.items():
+            self.offsets[orientation] = self.number(spaces)
+            self.moves[orientation] = [("a", orientation, -1, self.number(spaces), -1, 0),
+                                       ("d", orientation, 1, self.number(spaces), 1, 0)]
+            for key, direction in (("m", 1), ("n", -1)):
+                new_orientation, kick, checks = shape.rotation_table[(orientation, direction)]
+                if new_orientation != orientation or kick != (0, 0):
+                    self.moves[orientation].append((key, new_orientation, 0, self.number(checks), kick[0], kick[1]))
+            ordered = sorted(spaces)
+            dcol, drow = ordered[0]
+            outline = tuple([(dc - dcol, dr - drow) for dc, dr in ordered])
+            if outline not in self.outlines:
+                self.outlines.append(outline)
+            self.landings[orientation] = (self.outlines.index(outline), dcol, drow)
+
+    def number(self, spaces):
+        ''' Returns the number of a set of spaces (int), numbering it if it is new '''
+        if spaces not in self.numbers:
+            self.numbers[spaces] = len(self.spaces)
+            self.spaces.append(spaces)
+        return self.numbers[spaces]
+
+
+# Quadromino class -> its ShapeTables
+SHAPE_TABLES = {}
+
+
+def shapeTables(shape):
+    ''' Returns the ShapeTables for a Quadromino class, made the first time it is asked for '''
+    tables = SHAPE_TABLES.get(shape)
+    if tables == None:
+        tables = ShapeTables(shape)
+        SHAPE_TABLES[shape] = tables
+    return tables
+
+
+def columnMasks(grid):
+    ''' Returns the grid's columns, each one an int with a bit for every row that is filled (see
+    PlacementSearch), rows below the grid included (list of int). Searches on the same grid can
+    share them
+    INPUT
+    grid (PlayGrid, or anything with num_cols, num_rows and row_masks) - the grid'''
+    columns = [0b1111 << (grid.num_rows + ROWS_ABOVE)] * grid.num_cols
+    for row, mask in enumerate(grid.row_masks):
+        bit = 1 << (row + ROWS_ABOVE)
+        while mask:
+            lowest = mask & -mask
+            columns[lowest.bit_length() - 1] |= bit
+            mask ^= lowest
+    return columns
+
+
+def addSpaces(columns, spaces):
+    ''' Returns the columnMasks of a grid after the given spaces are filled, without working them
+    out again (list of int). Spaces above the grid are left out, as PlayGrid does
+    INPUT
+    columns (list of int) - the grid's columnMasks
+    spaces (iterable of (col, row) tuples) - the spaces to fill'''
+    columns = list(columns)
+    for col, row in spaces:
+        if row >= 0:
+            columns[col] |= 1 << (row + ROWS_ABOVE)
+    return columns
+
+
+def findPlacements(piece, grid, columns=None):
+    ''' Returns every place the piece can come to rest from where it is now, by moving, soft
+    dropping and rotating under the same rules as the game
+    INPUT
+    piece (Quadromino) - the piece to place, in its current location and orientation
+    grid (PlayGrid) - the grid the piece is in
+    columns (list of int) - columnMasks(grid), if the caller has them already
+
+    OUTPUT
+    placements (list of Placement) - one for every different set of spaces the piece can end up
+        filling (placements that look the same count once), in the order they were found. Empty if the piece
+        is already overlapping the grid, or is above it more than REACH columns past a wall'''
+    search = PlacementSearch(type(piece), grid, columns)
+    return search.search(piece.orientation, piece.square1.col, piece.square1.row)
@@ -2,7 +2,8 @@
 # 18 Nov 2020
 # quadrominos.py
 #  -a set of classes to play a game of Quatis/Tetris. Contains several different shaped
-#   Quadrominos, which each have their own methods of rotation and initialization
+#   Quadrominos, which each have their own rotation tables and initialization
+#   These classes are pure game logic: nothing here draws. See renderer.py for drawing.
 # 
 # Credits to Alexey Pajitnov for original game design of Tetris
 #         to John Zelle for the graphics.py package
@@ -19,12 +20,10 @@
 #
 # To run: Open the terminal at this file location and type "py game.py"
 
-import graphics as gr
-
-
 class Block():
     ''' Blocks take up spaces in the play grid and have collision 
-    These blocks make up Quadromino pieces'''
+    These blocks make up Quadromino pieces. A Block only knows its location and color,
+    the renderer decides how to show it'''
 
     def __init__(self, init_col, init_row, color):
         ''' Initializes Block object
@@ -34,12 +33,7 @@ class Block():
         color (Str) - the Block's color '''
         self.col = init_col
         self.row = init_row
-        # Each block is a 20 x 20 pixel rectangle
-        point1 = gr.Point(300 + self.col * 20, 200 + self.row * 20)
-        point2 = gr.Point(point1.getX() + 20, point1.getY() + 20)
-
-        self.square = gr.Rectangle(point1, point2)
-        self.square.setFill(color)
+        self.color = color
 
     def getColPos(self):
         ''' Returns the x position / column number on the grid '''
@@ -49,39 +43,44 @@ class Block():
         ''' Returns the y position / row number on the grid '''
         return self.row
 
-    def getSquare(self):
-        ''' Returns the main graphics.Rectangle object of the Block object '''
-        return self.square
+    def getColor(self):
+        ''' Returns the current fill color of the Block '''
+        return self.color
 
     def setColor(self, color):
         ''' Changes the color of the block
         INPUT
         color (Str) - the color to change the block to '''
-        self.square.setFill(color)
-
-    def draw(self, win):
-        ''' Draws the Block to the window 
-        INPUT
-        win (gr.GraphWin) the current graphics window'''
-        self.square.draw(win)
-
-    def undraw(self):
-        ''' Undraws the Block object '''
-        self.square.undraw()
+        self.color = color
     
     def move(self, dx, dy):
-        ''' Moves piece dx and dy units (each unit is 20 pixels / 1 grid space) 
+        ''' Moves piece dx and dy units (1 unit = 1 grid space) 
         INPUT
         dx (int) - the desired change in x / column number
         dy (int) - the desired change in y / row number'''
         self.col += dx
         self.row += dy
-        self.square.move(20 * dx, 20 * dy)
 
 class Quadromino():
     ''' A Quadromino is made of four Blocks that can move and rotate.
-    This class is a template. Specific Quadromino classes need to implement the rotate and canRotate functions
-    and initialize locations of Blocks differently '''
+    This class is a template. Specific Quadromino classes fill in the shape data below, which is
+    shared by every piece of that shape. A piece itself only stores where its Blocks are.
+    Pieces are reused after they lock (see PlayGrid.recycleQuadromino) '''
+    # color: the color of the piece's Blocks
+    # spawn: the (col, row) square1 starts at
+    # held_spot: the (col, row) square1 goes back to when the piece is put on hold
+    # held_shift: how many columns further right it moves after that (see resetPiece)
+    # offsets: orientation -> where each square sits relative to square1 (col, row)
+    # rotations: (orientation, direction) -> (new orientation, how far square1 moves)
+    # rotation_table and bottoms are built from these by buildShapeTables()
+    color = "white"
+    spawn = (3, 0)
+    held_spot = (3, 0)
+    held_shift = 0
+    offsets = {1: ((0, 0), (0, 0), (0, 0), (0, 0))}
+    rotations = {}
+    rotation_table = {}
+    bottoms = {}
     def __init__(self):
         # Initialize ghost piece (projected landing spot)
         self.ghost1 = Block(3, 0, "lightgrey")
@@ -89,31 +88,21 @@ class Quadromino():
         self.ghost3 = Block(3, 0, "lightgrey")
         self.ghost4 = Block(3, 0, "lightgrey")
         self.ghosts = [self.ghost1, self.ghost2, self.ghost3, self.ghost4]    
-        self.mini_squares = []
 
+        # Initialize piece
+        self.square1 = Block(0, 0, self.color)
+        self.square2 = Block(0, 0, self.color)
+        self.square3 = Block(0, 0, self.color)
+        self.square4 = Block(0, 0, self.color)
+        self.squares = [self.square1, self.square2, self.square3, self.square4]
+        self.respawn()
+
+    def respawn(self):
+        ''' Puts the piece back in its starting location and orientation, as if it was just made '''
         self.orientation = 1 # Used for proper rotation
         self.can_hold = True    # Every piece can only be held once
-
-        # Attributes from child classes
-        #self.squares = [self.square1, ... self.square4]
-        #self.color = "color"
+        self.placeSquares(self.spawn[0], self.spawn[1])
   
-    def draw(self, win):
-        ''' Draws the piece to the screen 
-        INPUT
-        win (gr.GraphWin) - the main graphics window'''
-        for ghost in self.ghosts:
-            ghost.draw(win)
-        for block in self.squares:
-            block.draw(win)
-
-    def undraw(self):
-        ''' Undraws the piece and its ghost '''
-        for ghost in self.ghosts:
-            ghost.undraw()
-        for block in self.squares:
-            block.undraw()
-            
     def checkMove(self, dx, dy, grid):
         ''' Returns true if piece can move dx dy units on the grid 
         INPUT
@@ -124,57 +113,74 @@ class Quadromino():
         OUTPUT
         canMove (bool) - True if the piece can move to the desired position without collision'''
 
-        canMove = True
-        for block in self.squares:
-            # Skip checking if movement is not possible
-            if canMove:
-                # Get the projected landing spot
-                col = block.getColPos() + dx
-                row = block.getRowPos() + dy
-                
-                # If projected space is occupied or out of bounds
-                if grid.spaceOccupied(col, row):
-                    canMove = False
-
-        return canMove 
+        # Check every projected landing spot against the grid's row bitmasks at once
+        return not grid.anyOccupied(self.square1.col + dx, self.square1.row + dy, self.offsets[self.orientation])
      
     def move(self, dx, dy, grid):
-        ''' Moves the entire piece dx, dy units / grid spaces (20 pixels) 
+        ''' Moves the entire piece dx, dy units / grid spaces 
         grid (PlayGrid) is the current PlayGrid for the game
         INPUT
         dx (int) - the desired change in x / column number
         dy (int) - the desired change in y / row number
-        grid (PlayGrid) - the game's PlayGrid object'''
+        grid (PlayGrid) - the game's PlayGrid object
+
+        OUTPUT
+        moved (bool) - True if the piece was able to move'''
 
         # If projected space is not occupied, move block:
         if self.checkMove(dx, dy, grid):
             for block in self.squares:
                 block.move(dx, dy)
+            return True
+        return False
         
     def hardDrop(self, grid):
-        ''' Drops piece as far as it will go and deposits it in place 
+        ''' Drops piece as far as it will go. It still has to be deposited (Engine does that,
+        timing it like every other deposit)
         INPUT
         grid (PlayGrid) - the game's current PlayGrid'''
-        # Calls move down method enough times to collide
-        for i in range(21):
-            self.move(0, 1, grid)
-        # Deposits blocks
-        self.depositQuadromino(grid) 
+        # Find the landing row once (from the grid's column heights) and move straight there
+        distance = grid.dropDistance(self.square1.col, self.square1.row, self.bottoms[self.orientation])
+        for block in self.squares:
+            block.move(0, distance)
 
-    def canRotate(self, grid):
-        ''' Returns true if piece can rotate 
+    def canRotate(self, direction, grid):
+        ''' Returns true if piece can rotate in the given direction
         INPUT
+        direction (int) {1, -1}
+            +1 for clockwise
+            -1 for counterclockwise 
         grid (PlayGrid) - the game's PlayGrid'''
-        pass
+        # Only the spaces the rotation moves squares into need to be empty
+        checks = self.rotation_table[(self.orientation, direction)][2]
+        return not grid.anyOccupied(self.square1.col, self.square1.row, checks)
         
     def rotate(self, direction, grid):
-        ''' Rotates the piece in the direction specified. 
+        ''' Rotates the piece in the direction specified, if it can. 
         INPUT
         direction (int) {1, -1}
             +1 for clockwise
             -1 for counterclockwise 
-        grid (PlayGrid) - the game's PlayGrid'''
-        pass
+        grid (PlayGrid) - the game's PlayGrid
+
+        OUTPUT
+        rotated (bool) - True if the piece changed position'''
+        new_orientation, kick, checks = self.rotation_table[(self.orientation, direction)]
+        if new_orientation == self.orientation and kick == (0, 0):
+            return False    # Shapes like the O piece look the same after turning
+        if not grid.anyOccupied(self.square1.col, self.square1.row, checks):
+            self.orientation = new_orientation
+            self.placeSquares(self.square1.col + kick[0], self.square1.row + kick[1])
+            return True
+        return False
+
+    def placeSquares(self, col, row):
+        ''' Moves every square into the shape of the current orientation, with square1 at (col, row) '''
+        offsets = self.offsets[self.orientation]
+        for idx in range(4):
+            block = self.squares[idx]
+            block.col = col + offsets[idx][0]
+            block.row = row + offsets[idx][1]
 
     def depositQuadromino(self, grid):
         ''' Places Quadromino onto the PlayGrid 
@@ -184,10 +190,6 @@ class Quadromino():
         for block in self.squares:
             grid.setSpace(block)
 
-        # Undraws ghost blocks
-        for ghost in self.ghosts:
-            ghost.undraw()
-
     def calcGhostMove(self, grid):
         ''' Returns the number of spaces a ghost projection can move down 
         INPUT
@@ -196,104 +198,19 @@ class Quadromino():
         OUTPUT
         num_moves (int) the number of times the ghost projection can move down before colliding'''
 
-        num_moves = 0
-
-        canMove = True
-
-        # Increase num_moves until there is a collision
-        while canMove:
-            for ghost in self.ghosts:
-                # Get projected location
-                row = ghost.getRowPos() + num_moves + 1
-                col = ghost.getColPos()
-
-                # If out of bounds or space occupied, set canMove to false
-                if grid.spaceOccupied(col, row):
-                    canMove = False
-            # If movement still possible, do another movement
-            if canMove:
-                num_moves += 1
-        return num_moves
+        # The grid's column heights give the landing spot without walking down row by row
+        return grid.dropDistance(self.square1.col, self.square1.row, self.bottoms[self.orientation])
 
     def projectGhost(self, grid):
         ''' Projects the landing location of the Quadromino 
         INPUT
         grid (PlayGrid) - the game's PlayGrid'''
-        # Match ghost with actual piece
-        for idx in range(4):
-            ghost_x = self.ghosts[idx].getColPos()
-            ghost_y = self.ghosts[idx].getRowPos()
-            target_x = self.squares[idx].getColPos()
-            target_y = self.squares[idx].getRowPos()
-            self.ghosts[idx].move(target_x - ghost_x, target_y - ghost_y)
-
-        # Move ghost piece as far as it is projected
+        # Match ghost with actual piece, moved down as far as it is projected
         num_moves = self.calcGhostMove(grid)
-        for i in range(num_moves):
-            for ghost in self.ghosts:
-                ghost.move(0, 1)
-
-    def drawMiniIcon(self, window, location):
-        ''' draws a miniature clone of the piece to use for the up_next icon / hold
-        location (int): 0 - draws in the up_next position
-                        1 - draws in the hold position  '''
-        # Draw smaller versions of each square (scaled x 0.8, with point 1 of the first square as the center)
-        anchor_point = self.square1.getSquare().getP1()
-        anchor_x = anchor_point.getX()
-        anchor_y = anchor_point.getY()
-        for square in self.squares:
-            # Get Square coordinates
-            rectangle = square.getSquare()
-            point1 = rectangle.getP1()
-            x1 = point1.getX()
-            y1 = point1.getY()
-            point2 = rectangle.getP2()
-            x2 = point2.getX()
-            y2 = point2.getY()
-
-            # Scale to the anchor by a factor of 0.8
-            x1 = (x1 - anchor_x) * 0.8
-            y1 = (y1 - anchor_y) * 0.8
-            x2 = (x2 - anchor_x) * 0.8
-            y2 = (y2 - anchor_y) * 0.8
-
-            mini_square = gr.Rectangle(gr.Point(x1, y1), gr.Point(x2, y2))
-            mini_square.setFill(self.color)
-            mini_square.draw(window)
-            self.mini_squares.append(mini_square)
-        
-        # Move the mini piece to the correct location
-        dx = 0
-        dy = 0
-        # offset pieces to center them all
-        if type(self) == JQuadromino:
-            dx += 32
-        elif type(self) == TQuadromino or type(self) == ZQuadromino:
-            dy -= 16
-        elif type(self) == OQuadromino:
-            dx += 8
-            dy -= 16
-        elif type(self) == IQuadromino:
-            dx -= 8
-            dy -= 8
+        for idx in range(4):
+            self.ghosts[idx].col = self.squares[idx].col
+            self.ghosts[idx].row = self.squares[idx].row + num_moves
 
-        # "Up Next" location
-        if location == 0:
-            dx += 520
-            dy += 245
-        # "Hold" location
-        elif location == 1:
-            dx += 231
-            dy += 245
-        
-        for square in self.mini_squares:
-            square.move(dx, dy)
-    
-    def undrawMini(self):
-        ''' Undraws the mini icon, wherever it is '''
-        for square in self.mini_squares:
-            square.undraw()
-   
     def canHold(self):
         ''' Returns true if the piece can be held, and sets can_hold to False '''
         return self.can_hold
@@ -305,747 +222,199 @@ class Quadromino():
         self.can_hold = state
 
     def resetPiece(self, grid):
-        ''' Returns piece to its original state and location 
+        ''' Returns piece to its upright orientation at its held_spot, then held_shift columns to
+        the right. Both are normal moves, so the piece only goes where the spaces are free
+        (otherwise it stays where it was, upright above the grid)
         INPUT
         grid (PlayGrid) - the game's PlayGrid'''
-        # Move to above the grid (to avoid all collision)
-        while not (self.square1.getRowPos() < -3):
-            for square in self.squares:     # Bypass checkMove to avoid collision with potential pieces above
-                square.move(0, -1)
-
-        # Return to upright rotation
+        # Lift it above the grid (to avoid all collision) and turn it upright there
+        self.placeSquares(self.square1.col, min(self.square1.row, -4))
         while not (self.orientation == 1):
             self.rotate(1, grid)
 
-        # Move to beginning location (square 1 to (3,0), with exception of J piece to (5,0))
-        current_x = self.square1.getColPos()
-        current_y = self.square1.getRowPos()
-        self.move(3 - current_x, 0 - current_y, grid)
-        if type(self) == JQuadromino:
-            self.move(2, 0, grid)
+        col, row = self.held_spot
+        self.move(col - self.square1.col, row - self.square1.row, grid)
+        if self.held_shift:
+            self.move(self.held_shift, 0, grid)
+
+
+
+def buildShapeTables(shape):
+    ''' Precomputes the rotation_table and bottoms of a Quadromino class from its offsets and rotations tables.
+    rotation_table: (orientation, direction) -> (new orientation, square1 movement, spaces to check),
+        where the spaces to check are the ones the rotation moves squares into (relative to square1).
+    bottoms: orientation -> the lowest square in each column the piece covers, as (dcol, drow) from square1
+    INPUT
+    shape (class) - a subclass of Quadromino'''
+    shape.rotation_table = {}
+    shape.bottoms = {}
+    for orientation in shape.offsets:
+        lowest = {}
+        for dc, dr in shape.offsets[orientation]:
+            lowest[dc] = max(dr, lowest.get(dc, dr))
+        shape.bottoms[orientation] = tuple(lowest.items())
+        for direction in (1, -1):
+            new_orientation, kick = shape.rotations.get((orientation, direction), (orientation, (0, 0)))
+            old_spaces = shape.offsets[orientation]
+            checks = []
+            for dc, dr in shape.offsets[new_orientation]:
+                space = (kick[0] + dc, kick[1] + dr)
+                if space not in old_spaces:
+                    checks.append(space)
+            shape.rotation_table[(orientation, direction)] = (new_orientation, kick, tuple(checks))
 
 
 # # # # # # # # # # # # # # # # #
 # Specific shaped Quadrominos:  #
 # - - - - - - - - - - - - - - - # # # # # # # # # # # # # # # # #
-# Every Shape has three methods:                                #
+# Every Shape only has data, shared by all of its pieces:       #
 #                                                               #
-# __init__(self, init_win):                                     #
-#       Constructs the Quadromino in the right shape and color  #
+# color, spawn:                                                 #
+#       The color of the shape and where square1 starts         #
+#       (held_spot, held_shift: where square1 goes back to when #
+#       the piece is put on hold, see Quadromino.resetPiece)    #
 #                                                               #
-# canRotate(self, direction, grid):                             #
-#       Uses self.orientation, direction, and grid to determine #
-#       if the piece is able to rotate                          #
+# offsets:                                                      #
+#       For every orientation, the (col, row) of each square    #
+#       relative to square1                                     #
 #                                                               #
-# rotate(self, direction, grid):                                #
-#       Uses self.orientation and direction to move the squares #
-#       around for rotation, IF canRotate returns true          #
+# rotations:                                                    #
+#       For every (orientation, direction), the orientation the #
+#       piece turns into and how far square1 moves. canRotate   #
+#       and rotate in Quadromino use these for every shape      #
 # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
 
 class TQuadromino(Quadromino):
     ''' Quadromino that looks like this: [] [] []
                                             []    '''
-    def __init__(self):
-        
-        # Initialize ghost pieces
-        super().__init__()
-        
-        # Initialize piece
-        self.color = "purple"
-        self.square1 = Block(3, 0, self.color)
-        self.square2 = Block(4, 0, self.color)
-        self.square3 = Block(4, 1, self.color)
-        self.square4 = Block(5, 0, self.color)
-
-        self.squares = [self.square1, self.square2, self.square3, self.square4]
-
-    def rotate(self, direction, grid):
-        ''' Rotates the piece in the direction specified. 
-        direction = +1 for clockwise
-        direction = -1 for counterclockwise '''
-
-        # If rotation is possible, use current orientation and direction
-        # to move Blocks to the next orientation
-        if self.canRotate(grid):                # Current orientation:
-            if self.orientation == 1:           # orientation 1: [1][2][4]  
-                if direction > 0:               #                   [3]
-                    self.orientation  = 2
-                    self.square4.move(-1, -1)
-                else:
-                    self.orientation = 4
-                    self.square1.move(1, 1)
-                    self.square3.move(1, -1)
-                    self.square4.move(-1, -1)
-                                                
-            elif self.orientation == 2:         # orientation 2:    [4]
-                if direction > 0:               #                [1][2]
-                    self.orientation = 3        #                   [3]
-                    self.square3.move(1, -1)
-                else:
-                    self.orientation = 1
-                    self.square4.move(1, 1)
-                    
-            elif self.orientation == 3:         # orientation 3:    [4]
-                if direction > 0:               #                [1][2][3]
-                    self.orientation = 4 
-                    self.square1.move(1, 1)
-                else:
-                    self.orientation = 2
-                    self.square3.move(-1, 1)
-
-            else:
-                if direction > 0:               # orientation 4:    [4]
-                    self.orientation = 1        #                   [2][3]
-                    self.square1.move(-1, -1)   #                   [1]
-                    self.square3.move(-1, 1)
-                    self.square4.move(1, 1)
-                else:
-                    self.orientation = 3
-                    self.square1.move(-1, -1)
-
-
-    def canRotate(self, grid):
-        ''' Returns true if piece can rotate '''
-
-        # With the T piece, we only check one position:
-        #           [X] <-------- The space that a rotation will occupy
-        #        [1][2][4]
-        #           [3]
-
-        canRotate = True
-        # Square 2 is the center Block
-        row = self.square2.getRowPos()
-        col = self.square2.getColPos()
-        # If the target space is occupied or out of bounds, do not rotate
-        if self.orientation == 1:
-            if grid.spaceOccupied(col, row - 1):
-                canRotate = False
-        elif self.orientation == 2:
-            if grid.spaceOccupied(col + 1, row):
-                canRotate = False
-        elif self.orientation == 3:
-            if grid.spaceOccupied(col, row + 1):
-                canRotate = False
-        else:
-            if grid.spaceOccupied(col - 1, row):
-                canRotate = False
-
-        return canRotate
+    color = "purple"
+    spawn = (3, 0)
+    offsets = {1: ((0, 0), (1, 0), (1, 1), (2, 0)),     # orientation 1: [1][2][4]
+                                                        #                   [3]
+               2: ((0, 0), (1, 0), (1, 1), (1, -1)),    # orientation 2:    [4]
+                                                        #                [1][2]
+                                                        #                   [3]
+               3: ((0, 0), (1, 0), (2, 0), (1, -1)),    # orientation 3:    [4]
+                                                        #                [1][2][3]
+               4: ((0, 0), (0, -1), (1, -1), (0, -2))}  # orientation 4:    [4]
+                                                        #                   [2][3]
+                                                        #                   [1]
+    rotations = {(1, 1): (2, (0, 0)),   (1, -1): (4, (1, 1)),
+                 (2, 1): (3, (0, 0)),   (2, -1): (1, (0, 0)),
+                 (3, 1): (4, (1, 1)),   (3, -1): (2, (0, 0)),
+                 (4, 1): (1, (-1, -1)), (4, -1): (3, (-1, -1))}
 
 class IQuadromino(Quadromino):
     ''' Quadromino that looks like : [] [] [] [] '''
-    def __init__(self):
-        # Initialize ghost pieces
-        super().__init__()
-
-        self.color = "cyan"
-        self.square1 = Block(3, 0, self.color)
-        self.square2 = Block(4, 0, self.color)
-        self.square3 = Block(5, 0, self.color)
-        self.square4 = Block(6, 0, self.color)
-
-        self.squares = [self.square1, self.square2, self.square3, self.square4]
-
-    def rotate(self, direction, grid):
-        ''' rotates the piece if it can. 
-        direction = +1 for clockwise
-        direction = -1 for counterclockwise'''
-        
-
-        if(self.canRotate(direction, grid)):
-            if self.orientation == 1:            # orientation 1:  [1][2][3][4]
-                if direction > 0:
-                    self.orientation = 2
-                    self.square1.move(2, 2)
-                    self.square2.move(1, 1)
-                    self.square4.move(-1, -1)
-                else:
-                    self.orientation = 4
-                    self.square1.move(1, -1)
-                    self.square3.move(-1, 1)
-                    self.square4.move(-2, 2)
-
-            elif self.orientation == 2:         # orientation 2:        [4]
-                if direction > 0:               #                       [3]
-                    self.orientation = 3        #                       [2]
-                    self.square4.move(-2, 2)    #                       [1]
-                    self.square3.move(-1, 1)
-                    self.square1.move(1, -1)    
-                else:
-                    self.orientation = 1
-                    self.square1.move(-2, -2)
-                    self.square2.move(-1, -1)
-                    self.square4.move(1, 1)
-
-            elif self.orientation == 3:         # orientation 3:  [4][3][2][1]
-                if direction > 0:
-                    self.orientation = 4
-                    self.square1.move(-2, -2)
-                    self.square2.move(-1, -1)
-                    self.square4.move(1, 1)
-                else:
-                    self.orientation = 2
-                    self.square1.move(-1, 1)
-                    self.square3.move(1, -1)
-                    self.square4.move(2, -2)
-            
-            else:                               # orientation 4:     [1]
-                if direction > 0:               #                    [2]
-                    self.orientation = 1        #                    [3]
-                    self.square1.move(-1, 1)    #                    [4]
-                    self.square3.move(1, -1)
-                    self.square4.move(2, -2)
-                else:
-                    self.orientation = 3
-                    self.square1.move(2, 2)
-                    self.square2.move(1, 1)
-                    self.square4.move(-1, -1)        
-
-    def canRotate(self, direction, grid):
-        ''' Returns true if the piece can rotate in the given direction on the given grid'''
-
-        # Set one square as the anchor that does not change position (based on orientation/direction)
-        # Check the spaces around the anchor, where the other squares will move to. See rotate() for orientation guide
-
-        can_rotate = True
-        # locations of spaces to check
-        cols = []
-        rows = []
-
-        if self.orientation == 1:
-            if direction > 0:   # 1 -> 2 anchor: [3]
-                # Get locations of target squares
-                anchor_row = self.square3.getRowPos()
-                cols.append(self.square3.getColPos())
-            else:   # 4 <- 1 anchor: [2]
-                anchor_row = self.square2.getRowPos()
-                cols.append(self.square2.getColPos())
-            # One block above, two below
-            rows += [anchor_row - 1, anchor_row + 1, anchor_row + 2]
-        elif self.orientation == 2:
-            if direction > 0:   # 2 -> 3 anchor: [2]
-                anchor_col = self.square2.getColPos()
-                rows.append(self.square2.getRowPos())
-            else:   # 1 <- 2 anchor: [3]
-                anchor_col = self.square3.getColPos()
-                rows.append(self.square3.getRowPos())
-            # One block right, two left
-            cols += [anchor_col + 1, anchor_col - 1, anchor_col - 2]
-        elif self.orientation == 3:
-            if direction > 0:   # 3 -> 4 anchor: [3]
-                anchor_row = self.square3.getRowPos()
-                cols.append(self.square3.getColPos())
-            else:   # 2 <- 3 anchor: [2]
-                anchor_row = self.square2.getRowPos()
-                cols.append(self.square2.getColPos())
-            # One block below, two above
-            cols += [anchor_row + 1, anchor_row - 1, anchor_row - 2]
-        else:   # orientation = 4
-            if direction > 0:   # 4 -> 1 anchor: [2]
-                anchor_col = self.square2.getColPos()
-                rows.append(self.square2.getRowPos())
-            else:   # 3 <- 4 anchor: [3]
-                anchor_col = self.square3.getColPos()
-                rows.append(self.square3.getRowPos())
-            # One block left, two right
-            cols += [anchor_col - 1, anchor_col + 1, anchor_col + 2]
-        
-        # Check all blocks until end is reached or a space is occupied
-        for row in rows:
-            for col in cols:
-                if can_rotate:
-                    # Important to ensure space is in-bounds before checking the space
-                    can_rotate = not grid.spaceOccupied(col, row)
-
-        # True if all spaces selected are not occupied
-        return can_rotate
+    color = "cyan"
+    spawn = (3, 0)
+    offsets = {1: ((0, 0), (1, 0), (2, 0), (3, 0)),     # orientation 1:  [1][2][3][4]
+               2: ((0, 0), (0, -1), (0, -2), (0, -3)),  # orientation 2:  [4] [3] [2] [1] from top to bottom
+               3: ((0, 0), (-1, 0), (-2, 0), (-3, 0)),  # orientation 3:  [4][3][2][1]
+               4: ((0, 0), (0, 1), (0, 2), (0, 3))}     # orientation 4:  [1] [2] [3] [4] from top to bottom
+    rotations = {(1, 1): (2, (2, 2)),   (1, -1): (4, (1, -1)),
+                 (2, 1): (3, (1, -1)),  (2, -1): (1, (-2, -2)),
+                 (3, 1): (4, (-2, -2)), (3, -1): (2, (-1, 1)),
+                 (4, 1): (1, (-1, 1)),  (4, -1): (3, (2, 2))}
                 
 class OQuadromino(Quadromino):
     ''' Quadromino that looks like : [] []
                                      [] [] '''
-    def __init__(self):
-        super().__init__()
-
-        self.color = "yellow"
-        self.square1 = Block(4, 0, self.color)
-        self.square2 = Block(5, 0, self.color)
-        self.square3 = Block(4, 1, self.color)
-        self.square4 = Block(5, 1, self.color)
-
-        self.squares = [self.square1, self.square2, self.square3, self.square4]
+    color = "yellow"
+    spawn = (4, 0)
+    # The O piece looks the same in every orientation, so it never rotates
+    offsets = {1: ((0, 0), (1, 0), (0, 1), (1, 1))}
+    rotations = {}
 
 class LQuadromino(Quadromino):
     ''' Quadromino that looks like this:    []
                                             []
                                             [] [] '''
-    def __init__(self):
-        super().__init__()
-
-        self.color = "orange"
-        self.square1 = Block(3, 1, self.color)
-        self.square2 = Block(4, 1, self.color)
-        self.square3 = Block(5, 1, self.color)
-        self.square4 = Block(5, 0, self.color)
-
-        self.squares = [self.square1, self.square2, self.square3, self.square4]
-
-    def canRotate(self, direction, grid):
-        ''' Returns true if the piece can rotate in the given direction '''
-        # Always need to check 2 spaces, so use two booleans. True if empty                      X [4]
-        space1 = False      # Space 1, regardless of direction, is the "elbow" of the piece: [1][2][3]
-        space2 = False      # Space 2 is dependent on orientation and direction, and is found relative to space 1
-        if self.orientation == 1:
-            # Find the position of the "elbow" location
-            row = self.square2.getRowPos() - 1
-            col = self.square2.getColPos()
-            space1 = not grid.spaceOccupied(col, row)
-            # Find the position of space2
-            if direction > 0:   # 1 -> 2
-                row += -1
-            else:   # 4 <- 1
-                row += 2
-                col += 1
-            space2 = not grid.spaceOccupied(col, row)
-
-        elif self.orientation == 2:
-            row = self.square3.getRowPos() - 1
-            col = self.square3.getColPos()
-            space1 = not grid.spaceOccupied(col, row)
-            if direction > 0:   # 2 -> 3
-                col += 1
-            else:   # 1 <- 2
-                row += 1
-                col += -2
-            space2 = not grid.spaceOccupied(col, row)
-
-        elif self.orientation == 3:
-            row = self.square1.getRowPos() + 1
-            col = self.square1.getColPos()
-            space1 = not grid.spaceOccupied(col, row)
-            if direction > 0:   # 3 -> 4
-                row += 1
-            else:   # 2 <- 3
-                row += -2
-                col += -1
-            space2 = not grid.spaceOccupied(col, row)
-
-        else:
-            row = self.square1.getRowPos() + 1
-            col = self.square1.getColPos()
-            space1 = not grid.spaceOccupied(col, row)
-            if direction > 0:   # 4 -> 1
-                col += -1
-            else:   # 3 <- 4
-                row += -1
-                col += 2
-            space2 = not grid.spaceOccupied(col, row)
-
-        return space1 and space2
-            
-    def rotate(self, direction, grid):
-        ''' Rotates the piece in the direction if possible.
-        direction = +1 clockwise
-        direction = -1 counterclockwise '''
-        if self.canRotate(direction, grid):
-            if self.orientation == 1:           # orientation 1:       [4]
-                if direction > 0:               #                [1][2][3]
-                    self.orientation = 2
-                    self.square4.move(-1, 0)
-                    self.square1.move(1, -2)
-                else:
-                    self.orientation = 4
-                    self.square2.move(1, 1)
-                    self.square1.move(1, -1)
-            
-            elif self.orientation == 2:         # orientation 2:    [1]
-                if direction > 0:               #                   [4]
-                    self.orientation = 3        #                   [2][3]
-                    self.square1.move(1, 1)
-                    self.square3.move(1, -1)
-                else:
-                    self.orientation = 1
-                    self.square1.move(-1, 2)
-                    self.square4.move(1, 0)
-            
-            elif self.orientation == 3:         # orientation 3:    [4][1][3]
-                if direction > 0:               #                   [2]
-                    self.orientation = 4
-                    self.square1.move(-1, 0)
-                    self.square2.move(1, 1)
-                    self.square3.move(-1, 1)
-                    self.square4.move(1, 0)
-                else:
-                    self.orientation = 2
-                    self.square1.move(-1, -1)
-                    self.square3.move(-1, 1)
-
-            else:                               # orientation 4:    [1][4]
-                if direction > 0:               #                      [3]
-                    self.orientation = 1        #                      [2]
-                    self.square1.move(-1, 1)
-                    self.square2.move(-1, -1)
-                else: 
-                    self.orientation = 3
-                    self.square1.move(1, 0)
-                    self.square2.move(-1, -1)
-                    self.square3.move(1, -1)
-                    self.square4.move(-1, 0)
+    color = "orange"
+    spawn = (3, 1)
+    offsets = {1: ((0, 0), (1, 0), (2, 0), (2, -1)),    # orientation 1:       [4]
+                                                        #                [1][2][3]
+               2: ((0, 0), (0, 2), (1, 2), (0, 1)),     # orientation 2:    [1]
+                                                        #                   [4]
+                                                        #                   [2][3]
+               3: ((0, 0), (-1, 1), (1, 0), (-1, 0)),   # orientation 3:    [4][1][3]
+                                                        #                   [2]
+               4: ((0, 0), (1, 2), (1, 1), (1, 0))}     # orientation 4:    [1][4]
+                                                        #                      [3]
+                                                        #                      [2]
+    rotations = {(1, 1): (2, (1, -2)),  (1, -1): (4, (1, -1)),
+                 (2, 1): (3, (1, 1)),   (2, -1): (1, (-1, 2)),
+                 (3, 1): (4, (-1, 0)),  (3, -1): (2, (-1, -1)),
+                 (4, 1): (1, (-1, 1)),  (4, -1): (3, (1, 0))}
 
 class JQuadromino(Quadromino):
     ''' Quadromino that looks like this:    []
                                             []
                                          [] [] 
         Mirror of the LQuadromino'''
-    def __init__(self):
-        super().__init__()
-
-        self.color = "blue"
-        self.square1 = Block(5, 1, self.color)
-        self.square2 = Block(4, 1, self.color)
-        self.square3 = Block(3, 1, self.color)
-        self.square4 = Block(3, 0, self.color)
-
-        self.squares = [self.square1, self.square2, self.square3, self.square4]
-
-    def canRotate(self, direction, grid):
-        ''' Returns true if the piece is able to rotate in the given direction '''
-        # Just like the L piece but with different values.
-        # We check space1 in the "elbow" of the piece, and space2 is relative to the "elbow"
-        space1 = False
-        space2 = False
-        if self.orientation == 1:
-            row = self.square2.getRowPos() - 1
-            col = self.square2.getColPos()
-            space1 = not grid.spaceOccupied(col, row)
-            if direction > 0:
-                row += -1
-            else:
-                col += -1
-                row += 2
-            space2 = not grid.spaceOccupied(col, row)
-        
-        elif self.orientation == 2:
-            col = self.square3.getColPos()
-            row = self.square3.getRowPos() - 1
-            space1 = not grid.spaceOccupied(col, row)
-            if direction > 0:
-                col += -1
-            else:
-                col += 2
-                row += 1
-            space2 = not grid.spaceOccupied(col, row)
-        
-        elif self.orientation == 3:
-            col = self.square1.getColPos()
-            row = self.square1.getRowPos() + 1
-            space1 = not grid.spaceOccupied(col, row)
-            if direction > 0:
-                row += 1
-            else:
-                col += 1
-                row += -2
-            space2 = not grid.spaceOccupied(col, row)
-        
-        else:
-            col = self.square1.getColPos()
-            row = self.square1.getRowPos() + 1
-            space1 = not grid.spaceOccupied(col, row)
-            if direction > 0:
-                col += 1
-            else:
-                col += -2
-                row += -1
-            space2 = not grid.spaceOccupied(col, row)
-
-        return space1 and space2
-
-
-
-    def rotate(self, direction, grid):
-        ''' Rotates the piece in the givn direction if possible.
-        direction = +1 clockwise
-        direction = -1 counterclockwise '''
-        # Note: direction variable is reversed because this method is based off of the LQuadromino
-        # Class, which is mirrored. Thus clockwise <-> counterclockwise
-        direction = -1 * direction
-        if self.canRotate(direction, grid):
-            if self.orientation == 1:           # orientation 1:    [4]
-                if direction > 0:               #                   [3][2][1]
-                    self.orientation = 2
-                    self.square1.move(-1, -2)
-                    self.square4.move(1, 0)
-                else:
-                    self.orientation = 4
-                    self.square2.move(-1, 1)
-                    self.square1.move(-1, -1)
-
-            elif self.orientation == 2:         # orientation 2:       [1]
-                if direction > 0:               #                      [4]
-                    self.orientation = 3        #                   [3][2]
-                    self.square3.move(-1, -1)
-                    self.square1.move(-1, 1)
-                else:
-                    self.orientation = 1
-                    self.square1.move(1, 2)
-                    self.square4.move(-1, 0)
-
-            elif self.orientation == 3:         # orientation 3: [3][1][4]
-                if direction > 0:               #                      [2]
-                    self.orientation = 4
-                    self.square1.move(1, 0)
-                    self.square4.move(-1, 0)
-                    self.square2.move(-1, 1)
-                    self.square3.move(1, 1)
-                else:
-                    self.orientation = 2
-                    self.square3.move(1, 1)
-                    self.square1.move(1, -1)
-            
-            else:                               # orientation 4:    [4][1]
-                if direction > 0:               #                   [3]
-                    self.orientation = 1        #                   [2]
-                    self.square2.move(1, -1)
-                    self.square1.move(1, 1)
-                else:
-                    self.orientation = 3
-                    self.square1.move(-1, 0)
-                    self.square4.move(1, 0)
-                    self.square2.move(1, -1)
-                    self.square3.move(-1, -1)
+    color = "blue"
+    spawn = (5, 1)
+    held_shift = 2      # square1 is on the right end, so this lines it up with the other shapes
+    # Because the J piece mirrors the L piece, clockwise turns go 1 -> 4 -> 3 -> 2 -> 1
+    offsets = {1: ((0, 0), (-1, 0), (-2, 0), (-2, -1)), # orientation 1:    [4]
+                                                        #                   [3][2][1]
+               2: ((0, 0), (0, 2), (-1, 2), (0, 1)),    # orientation 2:       [1]
+                                                        #                      [4]
+                                                        #                   [3][2]
+               3: ((0, 0), (1, 1), (-1, 0), (1, 0)),    # orientation 3: [3][1][4]
+                                                        #                      [2]
+               4: ((0, 0), (-1, 2), (-1, 1), (-1, 0))}  # orientation 4:    [4][1]
+                                                        #                   [3]
+                                                        #                   [2]
+    rotations = {(1, 1): (4, (-1, -1)), (1, -1): (2, (-1, -2)),
+                 (2, 1): (1, (1, 2)),   (2, -1): (3, (-1, 1)),
+                 (3, 1): (2, (1, -1)),  (3, -1): (4, (1, 0)),
+                 (4, 1): (3, (-1, 0)),  (4, -1): (1, (1, 1))}
 
 class SQuadromino(Quadromino):
     ''' Quadromino that looks like this:    [] []
                                          [] []       '''
-    def __init__(self):
-        super().__init__()
-
-        self.color = "lightgreen"
-        self.square1 = Block(3, 1, self.color)
-        self.square2 = Block(4, 1, self.color)
-        self.square3 = Block(4, 0, self.color)
-        self.square4 = Block(5, 0, self.color)
-
-        self.squares = [self.square1, self.square2, self.square3, self.square4]
-
-    def canRotate(self, direction, grid):
-        ''' Returns true if the piece is able to rotate in the direction '''
-        #|   | A |   |   |
-        #|   |[3]|[4]|   |
-        #|[1]|[2]| X |   | <--- We always check this corner (like the "elbow" with the other piecees)
-        #|   |   | B |   |      And the other space to check is relative to the inner corner
-
-        col1 = 0    # (col1, row1) for the inner corner/space1
-        row1 = 0
-        col2 = 0    # (col2, row2) for the other space/space2
-        row2 = 0    
-
-        # Get the correct spaces
-        if self.orientation == 1:
-            row1 = self.square4.getRowPos() + 1
-            col1 = self.square4.getColPos()
-            if direction > 0: # 1 -> 2
-                col2 = col1 - 1
-                row2 = row1 - 2
-            else:   # 1 -> 4
-                row2 = row1 + 1
-                col2 = col1
-        
-        elif self.orientation == 2:
-            col1 = self.square3.getColPos()
-            row1 = self.square3.getRowPos() + 1
-            if direction > 0:   # 2 -> 3
-                col2 = col1 + 2
-                row2 = row1 - 1
-            else:   # 2 -> 1
-                col2 = col1 -1
-                row2 = row1
-        
-        elif self.orientation == 3:
-            col1 = self.square3.getColPos()
-            row1 = self.square3.getRowPos() - 1
-            if direction > 0:   # 3 -> 4
-                col2 = col1 + 1
-                row2 = row1 + 2
-            else:   # 3 -> 2
-                row2 = row1 - 1
-                col2 = col1
-        
-        else:
-            col1 = self.square2.getColPos()
-            row1 = self.square2.getRowPos() - 1
-            if direction > 0:   # 4 -> 1
-                col2 = col1 - 2
-                row2 = row1 + 1
-            else:   # 4 -> 3
-                col2 = col1 + 1
-                row2 = row1
-
-        # True if both space1 and space2 are not occupied
-        return (not grid.spaceOccupied(col1, row1)) and (not grid.spaceOccupied(col2, row2))
-
-    def rotate(self, direction, grid):
-        ''' Rotates the piece if it can.
-        direction = +1 clockwise
-        direction = -1 counterclockwise '''
-        if self.canRotate(direction, grid):
-            if self.orientation == 1:           # orientation 1:    [3][4]
-                if direction > 0:               #                [1][2]
-                    self.orientation = 2
-                    self.square2.move(1, 0)
-                    self.square1.move(1, -2)
-                else:
-                    self.orientation = 4
-                    self.square1.move(2, 1)
-                    self.square2.move(1, 0)
-                    self.square3.move(0, 1)
-                    self.square4.move(-1, 0)
-            
-            elif self.orientation == 2:         # orientation 2:    [1]
-                if direction > 0:               #                   [3][4]
-                    self.orientation = 3        #                      [2]
-                    self.square3.move(0, 1)
-                    self.square1.move(2, 1)
-                else:
-                    self.orientation = 1
-                    self.square2.move(-1, 0)
-                    self.square1.move(-1, 2)
-            
-            elif self.orientation == 3:         # orientation 3:       [4][1]
-                if direction > 0:               #                   [3][2]
-                    self.orientation = 4
-                    self.square4.move(-1, 0)
-                    self.square1.move(-1, 2)
-                else:
-                    self.orientation = 2
-                    self.square3.move(0, -1)
-                    self.square1.move(-2, -1)
-            
-            else:
-                if direction > 0:               # orientation 4:    [4]
-                    self.orientation = 1        #                [3][2]
-                    self.square1.move(-2, -1)   #                [1]
-                    self.square2.move(-1, 0)
-                    self.square3.move(0, -1)
-                    self.square4.move(1, 0)
-                else:
-                    self.orientation = 3
-                    self.square4.move(1, 0)
-                    self.square1.move(1, -2)
+    color = "lightgreen"
+    spawn = (3, 1)
+    offsets = {1: ((0, 0), (1, 0), (1, -1), (2, -1)),   # orientation 1:    [3][4]
+                                                        #                [1][2]
+               2: ((0, 0), (1, 2), (0, 1), (1, 1)),     # orientation 2:    [1]
+                                                        #                   [3][4]
+                                                        #                      [2]
+               3: ((0, 0), (-1, 1), (-2, 1), (-1, 0)),  # orientation 3:       [4][1]
+                                                        #                   [3][2]
+               4: ((0, 0), (0, -1), (-1, -1), (-1, -2))}    # orientation 4:    [4]
+                                                            #                   [3][2]
+                                                            #                      [1]
+    rotations = {(1, 1): (2, (1, -2)),  (1, -1): (4, (2, 1)),
+                 (2, 1): (3, (2, 1)),   (2, -1): (1, (-1, 2)),
+                 (3, 1): (4, (-1, 2)),  (3, -1): (2, (-2, -1)),
+                 (4, 1): (1, (-2, -1)), (4, -1): (3, (1, -2))}
             
 class ZQuadromino(Quadromino):
     ''' Quadromino that looks like this:    [] []
                                                [] [] '''
-    def __init__(self):
-        super().__init__()
-
-        self.color = "red"
-        self.square1 = Block(3, 0, self.color)
-        self.square2 = Block(4, 0, self.color)
-        self.square3 = Block(4, 1, self.color)
-        self.square4 = Block(5, 1, self.color)
-
-        self.squares = [self.square1, self.square2, self.square3, self.square4]
-
-    def canRotate(self, direction, grid):
-        ''' Returns true if the piece is able to rotate in the direction '''
-        #|   |   | A |   |
-        #|[1]|[2]| X |   | <--- We always check this corner (like the "elbow" with the other piecees)
-        #|   |[3]|[4]|   |      And the other space to check is relative to the inner corner
-        #|   | B |   |   |      
-
-        col1 = 0    # (col1, row1) for the inner corner/space1
-        row1 = 0
-        col2 = 0    # (col2, row2) for the other space/space2
-        row2 = 0    
-        # Get the correct spaces
-        if self.orientation == 1:
-            col1 = self.square4.getColPos()
-            row1 = self.square4.getRowPos() - 1
-            if direction > 0:
-                col2 = col1
-                row2 = row1 - 1
-            else:
-                col2 = col1 - 1
-                row2 = row1 + 2
-        
-        elif self.orientation == 2:
-            col1 = self.square4.getColPos()
-            row1 = self.square4.getRowPos() + 1
-            if direction > 0:
-                col2 = col1 + 1
-                row2 = row1
-            else:
-                col2 = col1 - 2
-                row2 = row1 - 1
-        
-        elif self.orientation == 3:
-            col1 = self.square2.getColPos()
-            row1 = self.square2.getRowPos() + 1
-            if direction > 0:
-                col2 = col1
-                row2 = row1 + 1
-            else:
-                col2 = col1 + 1
-                row2 = row1 - 2
-
-        else:
-            col1 = self.square2.getColPos()
-            row1 = self.square2.getRowPos() - 1
-            if direction > 0:
-                col2 = col1 - 1
-                row2 = row1
-            else:
-                col2 = col1 + 2
-                row2 = row1 + 1
-
-        # True if both (col1, row1) and (col2, row2) are not occupied
-        return (not grid.spaceOccupied(col1, row1)) and (not grid.spaceOccupied(col2, row2))
-
-    def rotate(self, direction, grid):
-        ''' Rotates the piece if it can.
-        direction = +1 clockwise
-        direction = -1 counterclockwise '''
-        if self.canRotate(direction, grid):
-            if self.orientation == 1:           # orientation 1:[1][2]
-                if direction > 0:               #                  [3][4]
-                    self.orientation = 2
-                    self.square4.move(0, -1)
-                    self.square1.move(2, -1)
-                else:
-                    self.orientation = 4
-                    self.square1.move(1, 2)
-                    self.square2.move(0, 1)
-                    self.square3.move(1, 0)
-                    self.square4.move(0, -1)
-
-            elif self.orientation == 2:         # orientation 2:      [1]
-                if direction > 0:               #                  [2][4]
-                    self.orientation = 3        #                  [3]
-                    self.square3.move(1, 0)
-                    self.square1.move(1, 2)
-                else:
-                    self.orientation = 1
-                    self.square4.move(0, 1)
-                    self.square1.move(-2, 1)
-
-            elif self.orientation == 3:         # orientation 3:   [2][4]
-                if direction > 0:               #                     [3][1]
-                    self.orientation = 4
-                    self.square2.move(0, 1)
-                    self.square1.move(-2, 1)
-                else:
-                    self.orientation = 2
-                    self.square3.move(-1, 0)
-                    self.square1.move(-1, -2)
-
-            else:
-                if direction > 0:               # orientation 4:      [4]
-                    self.orientation = 1        #                  [2][3]
-                    self.square1.move(-1, -2)   #                  [1]
-                    self.square2.move(0, -1)
-                    self.square3.move(-1, 0)
-                    self.square4.move(0, 1)                    
-                else:
-                    self.orientation = 3
-                    self.square2.move(0, -1)
-                    self.square1.move(2, -1)
+    color = "red"
+    spawn = (3, 0)
+    offsets = {1: ((0, 0), (1, 0), (1, 1), (2, 1)),     # orientation 1: [1][2]
+                                                        #                   [3][4]
+               2: ((0, 0), (-1, 1), (-1, 2), (0, 1)),   # orientation 2:       [1]
+                                                        #                   [2][4]
+                                                        #                   [3]
+               3: ((0, 0), (-2, -1), (-1, 0), (-1, -1)),    # orientation 3: [2][4]
+                                                            #                   [3][1]
+               4: ((0, 0), (0, -1), (1, -1), (1, -2))}  # orientation 4:       [4]
+                                                        #                   [2][3]
+                                                        #                   [1]
+    rotations = {(1, 1): (2, (2, -1)),  (1, -1): (4, (1, 2)),
+                 (2, 1): (3, (1, 2)),   (2, -1): (1, (-2, 1)),
+                 (3, 1): (4, (-2, 1)),  (3, -1): (2, (-1, -2)),
+                 (4, 1): (1, (-1, -2)), (4, -1): (3, (2, -1))}
+
+
+# Every shape, in the order a new set of seven is dealt from
+SHAPES = (SQuadromino, ZQuadromino, JQuadromino, LQuadromino, TQuadromino, OQuadromino, IQuadromino)
+
+# Precompute the rotation tables once, when the module is imported
+for shape in SHAPES:
+    buildShapeTables(shape)
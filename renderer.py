@@ -0,0 +1,385 @@
+# renderer.py
+#  -draws a Quadtris game in a graphics.py window. The TkRenderer is an observer of the
+#   Engine (see engine.py): the engine tells it what changed and it updates the shapes on screen.
+#   The play field is drawn once as a grid of cells that only ever change color, taken from the
+#   PlayGrid's colors.
+#   Animations (line clears, the game over sweep) never sleep: they are timed steps that the
+#   game loop moves forward every frame by calling animate().
+#
+# To run: Open the terminal at this file location and type "py game.py"
+
+import time
+import graphics as gr
+import quadrominos as quad
+from engine import GameObserver
+
+
+# The play field's own colors, shown by cells with no block in them
+EMPTY_COLOR = "#7A7A7A"
+GRID_COLOR = "#5C5C5C"
+
+
+def makeSquare(col, row, color):
+    ''' Returns a 20 x 20 pixel gr.Rectangle for the given grid space
+    INPUT
+    col (int) [0, 9] - the column of the space
+    row (int) [0, 19] - the row of the space
+    color (Str) - the fill color'''
+    point1 = gr.Point(300 + col * 20, 200 + row * 20)
+    point2 = gr.Point(point1.getX() + 20, point1.getY() + 20)
+    square = gr.Rectangle(point1, point2)
+    square.setFill(color)
+    return square
+
+
+class TkRenderer(GameObserver):
+    ''' Shows the active piece, its ghost, the locked blocks, the NEXT/HOLD icons and the stats.
+    The play field is a fixed grid of 200 rectangles made once: locked blocks are shown by
+    changing the colors of the cells they are in, and only cells whose color changed are touched.
+    The active piece and its ghost are four tagged rectangles each, drawn on top of the cells,
+    so sliding either one is a single Tk call '''
+    def __init__(self, window, grid, animate=True, clock=time.perf_counter):
+        ''' Creates the renderer, the play field cells and the stat texts
+        INPUT
+        window (gr.GraphWin) - the graphics window in use
+        grid (PlayGrid) - the grid of the game being drawn, its colors are what the cells show
+        animate (bool) - False skips the line clear and game over animations (for fast-forwarding)
+        clock (function) - returns the current time in seconds, used to time the animations'''
+        self.window = window
+        self.grid = grid
+        self.animations_on = animate
+        self.clock = clock
+        self.num_cols = cols = grid.num_cols
+        self.num_rows = rows = grid.num_rows
+
+        # shown has the color each space has on screen
+        self.shown = [[EMPTY_COLOR] * cols for i in range(rows)]
+        self.makeCells()
+
+        # What should be on screen: the locked blocks' colors, which are the PlayGrid's own colors.
+        # The PlayGrid clears lines before they are animated, so while a line clear is animated
+        # the board is locked_rows instead: its rows as they were when the last piece locked
+        self.board = grid.colors
+        self.locked_rows = []
+        self.swept = 0          # How many rows the game over sweep has moved the board down
+        self.dirty = set()      # (col, row) spaces that may need a new color on the next render()
+        # Rectangles of the active piece and its ghost (tagged "piece" and "ghost"), and the
+        # (col, row) each one is drawn at
+        self.piece_squares = []
+        self.ghost_squares = []
+        self.piece_cells = []
+        self.ghost_cells = []
+        self.next_mini = []
+        self.hold_mini = []
+
+        # Line clear animation: rows still to flash white, the rows that are white now, and the
+        # rows to remove after that
+        self.flash_rows = []
+        self.white_rows = set()
+        self.cleared_rows = []
+        # Game over animation: the text to show and how many rows the sweep still has to clear
+        self.gg_txt = None
+        self.sweep_rows = 0
+        self.next_step = 0      # The time the next animation step is due
+
+        self.level_txt = gr.Text(gr.Point(535, 555), "LVL: 1")
+        self.level_txt.draw(window)
+        self.num_line_txt = gr.Text(gr.Point(555, 585), "Lines\t    \nCleared: 0")
+        self.num_line_txt.draw(window)
+        self.score_txt = gr.Text(gr.Point(400, 620), "SCORE: 0")
+        self.score_txt.draw(window)
+
+    def makeCells(self):
+        ''' Draws the empty play field: one rectangle per space, drawn once '''
+        self.cells = []
+        for row in range(self.num_rows):
+            self.cells.append([])
+            for col in range(self.num_cols):
+                cell = makeSquare(col, row, EMPTY_COLOR)
+                cell.setOutline(GRID_COLOR)
+                self.cells[row].append(cell)
+            self.window.drawAll(self.cells[row])
+
+    def cellColor(self, col, row):
+        ''' Returns the color the space at (col, row) should be shown in (Str) '''
+        row -= self.swept
+        if row < 0:
+            return EMPTY_COLOR
+        color = self.board[row][col]
+        if color == None:
+            return EMPTY_COLOR
+        if row in self.white_rows:
+            return "white"
+        return color
+
+    def markRows(self, first, last):
+        ''' Marks every space in rows first to last (inclusive) to be checked on the next render() '''
+        for row in range(first, last + 1):
+            for col in range(self.num_cols):
+                self.dirty.add((col, row))
+
+    def render(self):
+        ''' Recolors the cells that changed since the last render. Call once per frame '''
+        for col, row in self.dirty:
+            if 0 <= row < self.num_rows and 0 <= col < self.num_cols:
+                color = self.cellColor(col, row)
+                if color != self.shown[row][col]:
+                    self.shown[row][col] = color
+                    if color == EMPTY_COLOR:
+                        self.cells[row][col].setColors(color, GRID_COLOR)
+                    else:
+                        self.cells[row][col].setColors(color, "black")
+        self.dirty.clear()
+
+    def syncSquares(self, squares, cells, blocks, tag):
+        ''' Moves the rectangles in squares to the locations of blocks. When every block moved
+        the same way, the whole group moves with one Tk call
+        INPUT
+        squares (list of gr.Rectangle) - the rectangles drawn for the blocks, all tagged tag
+        cells (list of (col, row)) - where each rectangle is drawn now, updated in place
+        blocks (list of Block) - where the rectangles should be'''
+        shifts = set()
+        for idx in range(len(blocks)):
+            shifts.add((blocks[idx].getColPos() - cells[idx][0], blocks[idx].getRowPos() - cells[idx][1]))
+        if len(shifts) == 1:
+            dc, dr = shifts.pop()
+            if dc != 0 or dr != 0:
+                self.window.moveTag(tag, 20 * dc, 20 * dr)
+        else:
+            # Rotations move each square differently
+            for idx in range(len(blocks)):
+                dc = blocks[idx].getColPos() - cells[idx][0]
+                dr = blocks[idx].getRowPos() - cells[idx][1]
+                if dc != 0 or dr != 0:
+                    squares[idx].move(20 * dc, 20 * dr)
+        for idx in range(len(blocks)):
+            cells[idx] = (blocks[idx].getColPos(), blocks[idx].getRowPos())
+
+    def makeSquares(self, blocks, color, tag):
+        ''' Returns a list of new rectangles for blocks, with the given color and tag '''
+        squares = []
+        for block in blocks:
+            square = makeSquare(block.getColPos(), block.getRowPos(), color)
+            square.addTag(tag)
+            squares.append(square)
+        return squares
+
+    def undrawPiece(self):
+        ''' Undraws the active piece and its ghost '''
+        self.window.undrawAll(self.ghost_squares + self.piece_squares)
+        self.piece_squares = []
+        self.ghost_squares = []
+
+    def pieceSpawned(self, piece):
+        ''' Moves the piece rectangles to the new active piece, making them the first time '''
+        if not self.piece_squares:
+            self.ghost_cells = [(block.getColPos(), block.getRowPos()) for block in piece.ghosts]
+            self.piece_cells = [(block.getColPos(), block.getRowPos()) for block in piece.squares]
+            # Ghosts first so the piece is drawn on top of them
+            self.ghost_squares = self.window.drawAll(self.makeSquares(piece.ghosts, "lightgrey", "ghost"))
+            self.piece_squares = self.window.drawAll(self.makeSquares(piece.squares, piece.color, "piece"))
+            return
+        if self.piece_squares[0].config["fill"] != piece.color:
+            for square in self.piece_squares:
+                square.setFill(piece.color)
+        self.syncSquares(self.piece_squares, self.piece_cells, piece.squares, "piece")
+        self.syncSquares(self.ghost_squares, self.ghost_cells, piece.ghosts, "ghost")
+
+    def pieceMoved(self, piece):
+        self.syncSquares(self.piece_squares, self.piece_cells, piece.squares, "piece")
+
+    def ghostMoved(self, piece):
+        self.syncSquares(self.ghost_squares, self.ghost_cells, piece.ghosts, "ghost")
+
+    def pieceLocked(self, piece):
+        ''' The piece's blocks join the board. The piece rectangles stay where they are until
+        the next piece spawns '''
+        # The board has to be the PlayGrid's again before new blocks show up
+        self.finishLineClear()
+        # clearLines only moves the PlayGrid's rows around (and makes new empty ones), so a copy
+        # of the list of rows keeps them as they are now for a line clear animation
+        self.locked_rows = list(self.grid.colors)
+        for block in piece.squares:
+            col = block.getColPos()
+            row = block.getRowPos()
+            if row >= 0:
+                self.dirty.add((col, row))
+
+    def linesCleared(self, rows):
+        ''' Starts the line clear animation: each cleared row flashes white, 0.1 seconds apart,
+        then they are all cleared at once. Without animations they are cleared right away '''
+        self.finishLineClear()
+        if self.animations_on:
+            self.board = self.locked_rows
+            self.flash_rows = list(rows)
+            self.cleared_rows = rows
+            self.next_step = self.clock()
+            self.animate()
+        else:
+            self.markRows(0, rows[-1])
+
+    def finishLineClear(self):
+        ''' Skips to the end of the line clear animation, if one is running '''
+        if self.cleared_rows:
+            self.board = self.grid.colors
+            self.markRows(0, self.cleared_rows[-1])
+            self.flash_rows = []
+            self.white_rows.clear()
+            self.cleared_rows = []
+
+    def gameEnded(self, score):
+        ''' Starts the game over animation: removes the piece, shows the final score and
+        sweeps the board away one row at a time
+        INPUT
+        score (int) - the final score'''
+        self.finishLineClear()
+        self.undrawPiece()
+        self.gg_txt = gr.Text(gr.Point(400, 100), f"GAME OVER\nScore: {score}\nClick to close window.")
+        self.gg_txt.setSize(20)
+        self.sweep_rows = self.num_rows
+        if self.animations_on:
+            self.next_step = self.clock() + 0.25
+        else:
+            self.next_step = 0
+            self.animate()
+        self.render()
+
+    def animating(self):
+        ''' Returns true while an animation still has steps left (bool) '''
+        return len(self.cleared_rows) > 0 or self.sweep_rows > 0
+
+    def animate(self):
+        ''' Runs every animation step that is due, then shows the changes. Call once per frame '''
+        now = self.clock()
+        while self.animating() and now >= self.next_step:
+            if self.cleared_rows:
+                if self.flash_rows:
+                    row = self.flash_rows.pop(0)
+                    self.white_rows.add(row)
+                    self.markRows(row, row)
+                    self.next_step += 0.1
+                else:
+                    self.finishLineClear()
+            else:
+                if self.gg_txt.canvas == None:
+                    self.gg_txt.draw(self.window)
+                self.swept += 1
+                self.markRows(0, self.num_rows - 1)
+                self.sweep_rows -= 1
+                if self.animations_on:
+                    self.next_step += 0.1
+        self.render()
+
+    def drawMiniIcon(self, piece, location):
+        ''' draws a miniature clone of the piece to use for the up_next icon / hold
+        location (int): 0 - draws in the up_next position
+                        1 - draws in the hold position
+
+        OUTPUT
+        mini_squares (list of gr.Rectangle) - the drawn mini icon'''
+        mini_squares = []
+        # Draw smaller versions of each square (scaled x 0.8, with point 1 of the first square as the center)
+        anchor_x = piece.square1.getColPos() * 20
+        anchor_y = piece.square1.getRowPos() * 20
+        # Move the mini piece to the correct location
+        dx = 0
+        dy = 0
+        # offset pieces to center them all
+        if type(piece) == quad.JQuadromino:
+            dx += 32
+        elif type(piece) == quad.TQuadromino or type(piece) == quad.ZQuadromino:
+            dy -= 16
+        elif type(piece) == quad.OQuadromino:
+            dx += 8
+            dy -= 16
+        elif type(piece) == quad.IQuadromino:
+            dx -= 8
+            dy -= 8
+
+        # "Up Next" location
+        if location == 0:
+            dx += 520
+            dy += 245
+        # "Hold" location
+        elif location == 1:
+            dx += 231
+            dy += 245
+
+        for block in piece.squares:
+            # Scale to the anchor by a factor of 0.8
+            x1 = (block.getColPos() * 20 - anchor_x) * 0.8 + dx
+            y1 = (block.getRowPos() * 20 - anchor_y) * 0.8 + dy
+            mini_square = gr.Rectangle(gr.Point(x1, y1), gr.Point(x1 + 16, y1 + 16))
+            mini_square.setFill(piece.color)
+            mini_squares.append(mini_square)
+        return self.window.drawAll(mini_squares)
+
+    def upNextChanged(self, piece):
+        self.window.undrawAll(self.next_mini)
+        self.next_mini = self.drawMiniIcon(piece, 0)
+
+    def holdChanged(self, piece):
+        self.window.undrawAll(self.hold_mini)
+        self.hold_mini = self.drawMiniIcon(piece, 1)
+
+    def statsChanged(self, score, lines, level):
+        ''' Updates the score, nummber of lines cleared, and level on the GUI '''
+        self.score_txt.setText("SCORE: " + str(score))
+        self.num_line_txt.setText("Lines\t    \nCleared: " + str(lines))
+        self.level_txt.setText("LVL: " + str(level))
+
+
+class ImageRenderer(TkRenderer):
+    ''' A TkRenderer that draws the whole play field into one image, shown as a single canvas
+    item. Every row that changed is written into the image with one bulk put, so drawing costs
+    depend on the pixels that changed, not on how many items are on the canvas '''
+
+    def makeCells(self):
+        ''' Draws the empty play field as one image '''
+        width = self.num_cols * 20
+        height = self.num_rows * 20
+        self.image = gr.Image(gr.Point(300 + width / 2, 200 + height / 2), width, height)
+        self.image.draw(self.window)
+        self.cell_lines = {}    # color -> the pixel lines of a cell of that color
+        for row in range(self.num_rows):
+            self.paintRow(row, self.shown[row])
+
+    def rgb(self, color):
+        ''' Returns a Tk color (a name or "#rrggbb") as 3 bytes of RGB '''
+        red, green, blue = self.window.winfo_rgb(color)
+        return bytes((red >> 8, green >> 8, blue >> 8))
+
+    def cellLines(self, color):
+        ''' Returns the two kinds of pixel lines in a cell of the given color, as packed RGB bytes:
+        the top line (all outline), and every line below it (outline on the left, then fill).
+        Each cell draws only its top and left edges, so neighbors share one line between them '''
+        if color not in self.cell_lines:
+            if color == EMPTY_COLOR:
+                outline = self.rgb(GRID_COLOR)
+            else:
+                outline = self.rgb("black")
+            self.cell_lines[color] = (outline * 20, outline + self.rgb(color) * 19)
+        return self.cell_lines[color]
+
+    def paintRow(self, row, colors):
+        ''' Writes a row of cells into the image with a single putPixels
+        INPUT
+        row (int) [0, 19] - the row to paint
+        colors (list of Str) - the color of every cell in the row'''
+        lines = [self.cellLines(color) for color in colors]
+        top = b"".join([line[0] for line in lines])
+        body = b"".join([line[1] for line in lines])
+        self.image.putPixels(top + body * 19, 0, row * 20, self.num_cols * 20, 20)
+
+    def render(self):
+        ''' Repaints the rows that changed since the last render. Call once per frame '''
+        rows = set()
+        for col, row in self.dirty:
+            if 0 <= row < self.num_rows:
+                rows.add(row)
+        for row in rows:
+            colors = [self.cellColor(col, row) for col in range(self.num_cols)]
+            if colors != self.shown[row]:
+                self.shown[row] = colors
+                self.paintRow(row, colors)
+        self.dirty.clear()
@@ -0,0 +1,286 @@
+# simulate.py
+#  -plays Quadtris without a window, as fast as the computer allows. Every game is driven by a
+#   policy that picks the key to press on each tick, just like a player would. At the end the
+#   runner reports how fast it went (games, pieces and ticks per second) and how the games went
+#   (scores, lines cleared and levels reached).
+#   Games can be spread over several processes (--workers). Every game gets its own seed, made
+#   from --seed and the game's number, so a run plays the same games however it is split up.
+#   --scaling plays the same games with more and more workers to show how well it scales.
+#
+# To run: Open the terminal at this file location and type "py simulate.py --games 100"
+#         "py simulate.py --help" lists every option
+
+import argparse
+import importlib
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from bot import HeuristicBot
+from engine import Engine, GameObserver, TICKS_PER_SECOND
+
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+# Policies:                                                   #
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - #
+# A policy plays the game. Before every tick the runner calls #
+# nextInput(engine), which returns the key to press (the same #
+# strings Engine.processInput takes) or None to press nothing #
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+class RandomPolicy():
+    ''' Presses random keys '''
+    def __init__(self, rng, press_chance=0.2, keys="adsmnew"):
+        ''' INPUT
+        rng (random.Random) - where the random choices come from
+        press_chance (float) [0, 1] - the chance of pressing a key on any tick
+        keys (Str) - the keys to choose from, one character each'''
+        self.rng = rng
+        self.press_chance = press_chance
+        self.keys = keys
+
+    def nextInput(self, engine):
+        if self.rng.random() < self.press_chance:
+            return self.rng.choice(self.keys)
+        return None
+
+
+class ScriptedPolicy():
+    ''' Presses the keys of a script in order, one per tick, starting over at the end '''
+    def __init__(self, rng, script="aaw..ddw..mw..nw"):
+        ''' INPUT
+        rng (random.Random) - not used, every policy is given one
+        script (Str) - the keys to press, one character each. "." presses nothing'''
+        self.script = script
+        self.position = 0
+
+    def nextInput(self, engine):
+        key = self.script[self.position]
+        self.position = (self.position + 1) % len(self.script)
+        if key == ".":
+            return None
+        return key
+
+
+# Policies that can be picked by name on the command line. Any other policy can be given as
+# "module.ClassName", as long as the class takes rng as its first argument
+POLICIES = {"random": RandomPolicy,
+            "scripted": ScriptedPolicy,
+            "bot": HeuristicBot}
+
+
+def findPolicy(name):
+    ''' Returns the policy class with the given name, or imported from "module.ClassName" '''
+    if name in POLICIES:
+        return POLICIES[name]
+    module_name, dot, class_name = name.rpartition(".")
+    if not dot:
+        raise ValueError(f"unknown policy {name!r}, pick one of {', '.join(POLICIES)} or give module.ClassName")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+class PieceCounter(GameObserver):
+    ''' Counts the pieces that locked into place '''
+    def __init__(self):
+        self.pieces = 0
+
+    def pieceLocked(self, piece):
+        self.pieces += 1
+
+
+def playGame(policy, max_ticks, rng=None):
+    ''' Plays one game from start to game over (or until max_ticks ticks have run)
+    INPUT
+    policy - the policy that presses the keys
+    max_ticks (int) - the most ticks the game may last
+    rng (random.Random) - where the order of the pieces comes from (default: the random module)
+
+    OUTPUT
+    result (dict) - the game's score, lines, level, pieces and ticks'''
+    engine = Engine(rng=rng)
+    counter = PieceCounter()
+    engine.addObserver(counter)
+    engine.start()
+    while engine.gameActive() and engine.tick_count < max_ticks:
+        key = policy.nextInput(engine)
+        if key != None:
+            engine.processInput(key)
+        engine.update()
+    return {"score": engine.play_field.getScore(),
+            "lines": engine.play_field.getNumLines(),
+            "level": engine.level,
+            "pieces": counter.pieces,
+            "ticks": engine.tick_count}
+
+
+def playGames(policy_name, max_ticks, seeds, options=None):
+    ''' Plays one game for each seed, each with its own generators for the pieces and the policy.
+    This is what every worker process runs, so it only takes things that can be sent to one
+    INPUT
+    policy_name (Str) - the policy to play with (see findPolicy)
+    max_ticks (int) - the most ticks a game may last
+    seeds (list of int) - the seeds of the games to play
+    options (dict) - keyword arguments for the policy, like the scripted policy's script
+
+    OUTPUT
+    results (list of dict) - the result of every game, in the same order as seeds'''
+    policy_class = findPolicy(policy_name)
+    if options == None:
+        options = {}
+    results = []
+    for seed in seeds:
+        policy_rng = random.Random(f"{seed} policy")
+        policy = policy_class(policy_rng, **options)
+        results.append(playGame(policy, max_ticks, random.Random(f"{seed} pieces")))
+    return results
+
+
+def runGames(policy_name, max_ticks, seeds, workers, options=None):
+    ''' Plays a game for every seed and adds them up, using worker processes if workers > 1.
+    Results are added as soon as each batch of games comes back, not all at the end
+
+    OUTPUT
+    summary (Summary) - every game's result'''
+    summary = Summary()
+    if workers <= 1:
+        for result in playGames(policy_name, max_ticks, seeds, options):
+            summary.add(result)
+        return summary
+    # Small enough batches to keep every worker busy until the end, big enough that sending
+    # them back and forth doesn't take longer than playing them
+    batch = max(1, len(seeds) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(playGames, policy_name, max_ticks, seeds[start:start + batch], options)
+                   for start in range(0, len(seeds), batch)]
+        for future in as_completed(futures):
+            for result in future.result():
+                summary.add(result)
+    return summary
+
+
+class Summary():
+    ''' Adds up game results one at a time and reports on them '''
+    def __init__(self):
+        self.games = 0
+        self.pieces = 0
+        self.ticks = 0
+        self.scores = []
+        self.lines = []
+        self.levels = []
+
+    def add(self, result):
+        ''' Adds one game's result (dict, see playGame) '''
+        self.games += 1
+        self.pieces += result["pieces"]
+        self.ticks += result["ticks"]
+        self.scores.append(result["score"])
+        self.lines.append(result["lines"])
+        self.levels.append(result["level"])
+
+    def report(self, seconds):
+        ''' Returns the throughput and the score, line and level distributions (Str)
+        INPUT
+        seconds (float) - how long the games took to play'''
+        seconds = max(seconds, 1e-9)
+        lines = [f"{self.games} games in {seconds:.2f} s",
+                 f"  {self.games / seconds:12.1f} games/sec",
+                 f"  {self.pieces / seconds:12.1f} pieces/sec",
+                 f"  {self.ticks / seconds:12.1f} frames/sec "
+                 f"({self.ticks / seconds / TICKS_PER_SECOND:.1f}x real time)",
+                 "",
+                 "{:<8}{:>10}{:>10}{:>10}{:>10}{:>10}".format("", "min", "median", "mean", "p95", "max")]
+        for name, values in (("score", self.scores), ("lines", self.lines), ("level", self.levels)):
+            lines.append("{:<8}{:>10}{:>10}{:>10.1f}{:>10}{:>10}".format(name, *distribution(values)))
+        lines.append("")
+        lines.append("games per level:")
+        for level in sorted(set(self.levels)):
+            lines.append(f"  {level:>2}: {self.levels.count(level)}")
+        return "\n".join(lines)
+
+
+def distribution(values):
+    ''' Returns (min, median, mean, p95, max) of a list of numbers '''
+    if not values:
+        return (0, 0, 0, 0, 0)
+    ordered = sorted(values)
+    count = len(ordered)
+    return (ordered[0], ordered[count // 2], sum(ordered) / count,
+            ordered[min(count - 1, int(count * 0.95))], ordered[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plays Quadtris games without a window, as fast as possible")
+    parser.add_argument("--games", type=int, default=100, help="how many games to play (default 100)")
+    parser.add_argument("--policy", default="random",
+                        help=f"who plays: {', '.join(POLICIES)}, or module.ClassName (default random)")
+    parser.add_argument("--script", default=None,
+                        help="the keys the scripted policy presses, one per tick (\".\" for no key)")
+    parser.add_argument("--budget", type=float, default=None,
+                        help="the most milliseconds the bot may take to pick each placement")
+    parser.add_argument("--max-evaluations", type=int, default=None,
+                        help="the most grids the bot may score looking ahead for each placement. "
+                             "Without --budget, games then play out the same with any --workers")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the pieces and the policy")
+    parser.add_argument("--max-ticks", type=int, default=TICKS_PER_SECOND * 60 * 60,
+                        help="end a game after this many ticks (default one hour of play)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="how many processes play games at once (0 for one per CPU core)")
+    parser.add_argument("--scaling", action="store_true",
+                        help="play the same games with 1, 2, 4... up to --workers processes and compare the speeds")
+    args = parser.parse_args(argv)
+
+    try:
+        policy_class = findPolicy(args.policy)
+    except (ValueError, ImportError, AttributeError) as error:
+        parser.error(str(error))
+    options = {}
+    if args.script != None:
+        if not (isinstance(policy_class, type) and issubclass(policy_class, ScriptedPolicy)):
+            parser.error("--script only works with --policy scripted")
+        if args.script == "":
+            parser.error("--script needs at least one key")
+        options["script"] = args.script
+    if args.budget != None or args.max_evaluations != None:
+        if not (isinstance(policy_class, type) and issubclass(policy_class, HeuristicBot)):
+            parser.error("--budget and --max-evaluations only work with --policy bot")
+        # Given only a number of grids, the bot doesn't look at the clock at all
+        options["budget"] = None if args.budget == None else args.budget / 1000
+    if args.max_evaluations != None:
+        if args.max_evaluations < 1:
+            parser.error("--max-evaluations must be at least 1")
+        options["max_evaluations"] = args.max_evaluations
+    workers = args.workers
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    seed = args.seed
+    if seed == None:
+        seed = random.randrange(2**32)
+        print(f"seed {seed}")
+    # Game number n plays with seed + n, whichever process it ends up in
+    seeds = list(range(seed, seed + args.games))
+
+    if not args.scaling:
+        start = time.perf_counter()
+        summary = runGames(args.policy, args.max_ticks, seeds, workers, options)
+        print(summary.report(time.perf_counter() - start))
+        return
+
+    counts = [1]
+    while counts[-1] * 2 <= workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != workers:
+        counts.append(workers)
+    print("{:>8}{:>10}{:>12}{:>10}{:>12}".format("workers", "seconds", "games/sec", "speedup", "efficiency"))
+    single = None
+    for count in counts:
+        start = time.perf_counter()
+        runGames(args.policy, args.max_ticks, seeds, count, options)
+        seconds = time.perf_counter() - start
+        if single == None:
+            single = seconds
+        speedup = single / seconds
+        print("{:>8}{:>10.2f}{:>12.1f}{:>10.2f}{:>11.0f}%".format(count, seconds, len(seeds) / seconds,
+                                                             speedup, 100 * speedup / count))
+
+if __name__ == "__main__":
+    main()
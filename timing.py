@@ -0,0 +1,59 @@
+# timing.py
+#  -measures how long each phase of a frame takes (handling input, gravity, clearing lines,
+#   drawing...) so it's possible to tell which one is to blame when the game stutters.
+#   A PhaseTimer keeps the most recent durations of every phase and reports their
+#   mean, 95th and 99th percentile, and maximum.
+#
+# To run: Open the terminal at this file location and type "py game.py --timing"
+
+import time
+from collections import deque
+
+
+class PhaseTimer():
+    ''' Rolling timing statistics for the phases of a frame '''
+    def __init__(self, window=600, clock=time.perf_counter):
+        ''' Creates a timer with no measurements yet
+        INPUT
+        window (int) - how many of the most recent durations of each phase are kept
+        clock (function) - returns the current time in seconds'''
+        self.window = window
+        self.clock = clock
+        self.samples = {}   # phase name -> deque of the latest durations, in seconds
+
+    def add(self, phase, seconds):
+        ''' Records that a phase took the given number of seconds
+        INPUT
+        phase (Str) - the name of the phase
+        seconds (float) - how long it took'''
+        if phase not in self.samples:
+            self.samples[phase] = deque(maxlen=self.window)
+        self.samples[phase].append(seconds)
+
+    def call(self, phase, function, *args):
+        ''' Calls function(*args), records how long it took as the given phase, and returns
+        what the function returned '''
+        start = self.clock()
+        result = function(*args)
+        self.add(phase, self.clock() - start)
+        return result
+
+    def stats(self, phase):
+        ''' Returns (mean, p95, p99, max) of the recorded durations of a phase in seconds,
+        or None if the phase was never recorded '''
+        samples = self.samples.get(phase)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        count = len(ordered)
+        p95 = ordered[min(count - 1, int(count * 0.95))]
+        p99 = ordered[min(count - 1, int(count * 0.99))]
+        return (sum(ordered) / count, p95, p99, ordered[-1])
+
+    def report(self):
+        ''' Returns a table of every phase's statistics in milliseconds (Str) '''
+        lines = ["{:<20}{:>8}{:>8}{:>8}{:>8}".format("phase (ms)", "mean", "p95", "p99", "max")]
+        for phase in self.samples:
+            stats = self.stats(phase)
+            lines.append("{:<20}{:>8.3f}{:>8.3f}{:>8.3f}{:>8.3f}".format(phase, *[1000 * value for value in stats]))
+        return "\n".join(lines)